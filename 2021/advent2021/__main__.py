@@ -0,0 +1,194 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import enum
+import importlib
+import os
+import re
+import sys
+import time
+import traceback
+import types
+import typing
+import colorama
+from colorama import Fore, Style
+from advent2021 import core
+
+# Module-level values of these types can't be changed, so solutions can share them between threads.
+# (Tuples and read-only mappings are too, as long as everything in them is.)
+IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, range, frozenset, enum.Enum, re.Pattern,
+                   types.FunctionType, types.BuiltinFunctionType)
+
+@dataclass
+class Job:
+    """A single (day, part, input) to run."""
+    day: int
+    part: int
+    input_path: str
+
+    @property
+    def module_name(self) -> str:
+        return "advent2021.day{}".format(self.day)
+
+    def __str__(self):
+        return "Day {} Part {} ({})".format(self.day, self.part, self.input_path)
+
+@dataclass
+class JobResult:
+    """The outcome of running a `Job`."""
+    job: Job
+    result: typing.Any
+    duration: float
+
+    @property
+    def failed(self) -> bool:
+        return isinstance(self.result, Exception)
+
+def main():
+    """Runs a batch of solutions concurrently on a thread pool (within this process)."""
+    colorama.init()
+
+    parser = argparse.ArgumentParser("advent2021")
+    parser.add_argument("jobs",
+                        type=parse_job,
+                        nargs="+",
+                        metavar="DAY:PART:INPUT",
+                        help="A solution to run, e.g., '1:2:inputs/day1.txt' runs Day 1, Part 2 against inputs/day1.txt.")
+    parser.add_argument("--workers",
+                        type=int,
+                        default=os.cpu_count(),
+                        help="How many threads to run the jobs on. The default is the number of CPUs.")
+    parser.add_argument("--variant",
+                        default=core.REFERENCE_VARIANT,
+                        help="Which implementation of the parts would you like to run? The default is '{}'.".format(core.REFERENCE_VARIANT))
+    args = parser.parse_args()
+
+    # Import all of the solutions up front (without running them), so the import cost doesn't end
+    # up in our timings.
+    with core.collect_only():
+        modules = {job.module_name: importlib.import_module(job.module_name + ".__main__") for job in args.jobs}
+    for job in args.jobs:
+        if args.variant not in core.VARIANTS[job.module_name][job.part]:
+            parser.error("{} doesn't have a variant named '{}'.".format(job, args.variant))
+
+    # Is it actually possible for threads to run at the same time? Only if this is a free-threaded
+    # build of Python (3.13+) *and* the GIL hasn't been turned back on (e.g., via PYTHON_GIL=1, or by
+    # importing an extension module that doesn't support running without it).
+    gil_enabled = is_gil_enabled()
+
+    # Run all the jobs one after another first (so we know how long they take without threads)...
+    # Each job starts off with cold caches, otherwise it'd get a head start from whatever an earlier
+    # job memoized.
+    serial_results = []
+    serial_duration = 0.0
+    for job in args.jobs:
+        clear_memos()
+        started_at = time.perf_counter()
+        serial_results.append(run_job(job, args.variant))
+        serial_duration += time.perf_counter() - started_at
+
+    # ... and then all at once on our thread pool (starting off cold again, so the pool isn't just
+    # reading back what the serial pass already worked out).
+    clear_memos()
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        parallel_results = list(executor.map(lambda job: run_job(job, args.variant), args.jobs))
+    parallel_duration = time.perf_counter() - started_at
+
+    # Now print out a summary!
+    print()
+    print("The results are in!")
+    for (serial, parallel) in zip(serial_results, parallel_results):
+        if parallel.failed:
+            print(Fore.RED + "[❌] {}:\t{}: {}".format(parallel.job, type(parallel.result).__name__, parallel.result) + Style.RESET_ALL)
+        elif serial.failed or serial.result != parallel.result:
+            # Running the job on a thread (next to other jobs) gave us a different answer, which
+            # usually means that a solution is sharing state that it shouldn't be.
+            print(Fore.RED + "[❌] {}:\t{} (but {} when run by itself)".format(parallel.job, parallel.result, serial.result) + Style.RESET_ALL)
+        else:
+            print(Fore.GREEN + "[✅] {}:\t{}".format(parallel.job, parallel.result) + Style.RESET_ALL)
+            print(Fore.LIGHTBLUE_EX + "    [⏱ ] {0:#.3f} seconds by itself, {1:#.3f} seconds on the pool".format(serial.duration, parallel.duration) + Style.RESET_ALL)
+
+    speed_up = serial_duration / parallel_duration if parallel_duration > 0 else float("inf")
+    print()
+    print(Fore.BLUE + "[🧵] Workers:\t{}".format(args.workers) + Style.RESET_ALL)
+    print(Fore.BLUE + "[🔒] GIL:\t{}".format("Enabled" if gil_enabled else "Disabled (free-threaded)") + Style.RESET_ALL)
+    print(Fore.LIGHTBLUE_EX + "[⏱ ] Serial:\t{0:#.3f} seconds".format(serial_duration) + Style.RESET_ALL)
+    print(Fore.LIGHTBLUE_EX + "[⏱ ] Parallel:\t{0:#.3f} seconds ({1:.2f}× speed-up)".format(parallel_duration, speed_up) + Style.RESET_ALL)
+    if gil_enabled:
+        print(Fore.YELLOW + "[⚠️ ] The GIL is enabled, so the jobs took turns rather than running in parallel. "
+              "Use a free-threaded build of Python 3.13+ (e.g., python3.13t) to run them in parallel." + Style.RESET_ALL)
+    elif speed_up < 1.1:
+        print(Fore.YELLOW + "[⚠️ ] No parallel speed-up, even without the GIL." + Style.RESET_ALL)
+    else:
+        print(Fore.GREEN + "[✅] Got a parallel speed-up!" + Style.RESET_ALL)
+
+    # Finally, point out anything the solutions keep at the module level that a thread could change
+    # out from under another thread.
+    for (module_name, module) in modules.items():
+        for (name, value) in audit_module_state(module):
+            print(Fore.YELLOW + "[⚠️ ] {}.{} is shared mutable state ({})".format(module_name, name, type(value).__name__) + Style.RESET_ALL)
+
+    for result in parallel_results:
+        if result.failed:
+            print(Fore.YELLOW + "[❌] Exception ({}): ".format(result.job) + Style.RESET_ALL)
+            traceback.print_exception(type(result.result), result.result, result.result.__traceback__)
+
+def parse_job(spec: str) -> Job:
+    """Parses a `DAY:PART:INPUT` job from the command line."""
+    try:
+        (day, part, input_path) = spec.split(":", maxsplit=2)
+        job = Job(int(day), int(part), input_path)
+    except ValueError:
+        raise argparse.ArgumentTypeError("'{}' isn't of the form DAY:PART:INPUT".format(spec))
+
+    if job.part not in (1, 2):
+        raise argparse.ArgumentTypeError("'{}' has an invalid part (choose from 1, 2)".format(spec))
+    return job
+
+def run_job(job: Job, variant: str) -> JobResult:
+    """Runs `job` (using the `variant` implementation of its part), timing how long it took."""
+    run_part = core.VARIANTS[job.module_name][job.part][variant]
+    started_at = time.perf_counter()
+    try:
+        with open(job.input_path, "r") as file:
+            result = run_part(file)
+    except Exception as e:
+        result = e
+    return JobResult(job, result, time.perf_counter() - started_at)
+
+def clear_memos():
+    """Empties every memo the solutions use, so the next run starts with cold caches."""
+    for memoized in core.MEMOS:
+        memoized.cache_clear()
+
+def is_gil_enabled() -> bool:
+    """Returns whether the GIL is enabled. Before Python 3.13, it always is."""
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check() if check is not None else True
+
+def audit_module_state(module: types.ModuleType) -> typing.List[typing.Tuple[str, typing.Any]]:
+    """Finds the module-level values of `module` that can be changed (e.g., lists, dicts, and sets),
+    which aren't safe for solutions running on different threads to share."""
+    shared = []
+    for (name, value) in vars(module).items():
+        if name.startswith("__") and name.endswith("__"):
+            continue
+        if isinstance(value, (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, type)):
+            continue
+        if isinstance(value, core.Memo):
+            # Memos lock their cache before touching it, so they're safe to share.
+            continue
+        if __is_immutable(value):
+            continue
+        shared.append((name, value))
+    return shared
+
+def __is_immutable(value: typing.Any) -> bool:
+    if isinstance(value, tuple):
+        return all(__is_immutable(item) for item in value)
+    if isinstance(value, types.MappingProxyType):
+        return all(__is_immutable(key) and __is_immutable(item) for (key, item) in value.items())
+    return isinstance(value, IMMUTABLE_TYPES)
+
+main()
@@ -1,16 +1,134 @@
 import argparse
+from array import array
+import collections
+import contextlib
 from dataclasses import dataclass
+import enum
+import functools
+import inspect
+import io
+import multiprocessing
+import re
+import sys
+import threading
+import tracemalloc
 import typing
 import time
 import traceback
 import colorama
 from colorama import Fore, Style
 
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional--without it, the solutions' NumPy variants just aren't available (they check
+    # `np is not None`). Import it from here rather than straight from NumPy.
+    np = None
+
+PartFunc = typing.Callable[[typing.TextIO], str]
+
+# The name of the variant that the `part1` and `part2` functions passed to `run()` are registered
+# as. This is the implementation that all other variants are compared against.
+REFERENCE_VARIANT = "reference"
+
+# The name that can be passed to `--variant` to run every registered variant of a part.
+ALL_VARIANTS = "all"
+
+# How many bytes the integer tokenizer reads from the input at a time.
+TOKEN_CHUNK_SIZE = 1 << 16
+
+# Every memoized function (see `memo()`), so the summary can tell us how well they're doing.
+MEMOS: typing.List["Memo"] = []
+
+# The classes that solutions use to model their data (see `track_memory()`), whose per-object
+# footprint is reported when running with `--memory`.
+TRACKED_MODELS: typing.List[type] = []
+
+# All of the implementations we know about, keyed by the package of the solution (e.g.,
+# "advent2021.day1"), then by the part (1 or 2), then by the name of the variant.
+VARIANTS: typing.Dict[str, typing.Dict[int, typing.Dict[str, PartFunc]]] = {}
+
+# When set, `run()` only registers the parts of a solution instead of parsing the command line and
+# running one of them (see `collect_only()`).
+COLLECT_ONLY = False
+
+@contextlib.contextmanager
+def collect_only():
+    """Within this context, importing a solution only registers its parts (in `VARIANTS`) rather than
+    running it, so that other runners (e.g., `python -m advent2021`) can run the parts themselves."""
+    global COLLECT_ONLY
+    previous = COLLECT_ONLY
+    COLLECT_ONLY = True
+    try:
+        yield
+    finally:
+        COLLECT_ONLY = previous
+
+@dataclass(frozen=True)
+class Option:
+    """A command line option that only makes sense for a specific solution (e.g., `--window` for
+    Day 1). Its value is passed to the parts (and their variants) that take a keyword argument named
+    after it (e.g., `window`)."""
+    flag: str
+    type: typing.Callable[[str], typing.Any]
+    default: typing.Any
+    help: str
+
+    @property
+    def dest(self) -> str:
+        return self.flag.lstrip("-").replace("-", "_")
+
+def non_negative_int(value: str) -> int:
+    """An `Option` type for integers that can't be negative."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError("'{}' can't be negative".format(value))
+    return number
+
+def positive_int(value: str) -> int:
+    """An `Option` type for integers that have to be greater than zero."""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("'{}' must be greater than zero".format(value))
+    return number
+
+def variant(part: int, name: str, available: bool = True) -> typing.Callable[[PartFunc], PartFunc]:
+    """Registers the decorated function as an alternative implementation (named `name`) of `part`.
+
+    The variant can then be picked with `--variant NAME`, or compared with the reference
+    implementation (and all the other variants) using `--variant all`. Variants that rely on an
+    optional package (e.g., NumPy) should pass whether it's installed as `available`, so they're
+    only registered when they can actually run."""
+    def decorator(func: PartFunc) -> PartFunc:
+        if not available:
+            return func
+
+        # NOTE: When a solution is run via `python -m`, its module is named "__main__", so use the
+        #       package of the module instead (which is what gets passed to `run()`).
+        module_name = sys.modules[func.__module__].__package__
+        __register(module_name, part, name, func)
+        return func
+    return decorator
+
 def run(
     module_name: str,
      part1_func: typing.Callable[[typing.TextIO], str],
-     part2_func: typing.Callable[[typing.TextIO], str]):
+     part2_func: typing.Callable[[typing.TextIO], str],
+     options: typing.Sequence[Option] = ()):
     """Parses the arguments that were passed to the command line."""
+    # The parts that were passed in are our reference implementations.
+    __register(module_name, 1, REFERENCE_VARIANT, part1_func)
+    __register(module_name, 2, REFERENCE_VARIANT, part2_func)
+    if COLLECT_ONLY:
+        return
+
+    # A spawned worker process re-runs the solution's script (as `__mp_main__`) when it was started
+    # from a file path, but it's up to the solution to tell the worker what to do--not the command
+    # line. (When started with `-m`, the worker doesn't import the solution at all, so anything it
+    # runs has to live in a module it can import, e.g., `advent2021.day8.decode`.)
+    if multiprocessing.parent_process() is not None:
+        return
+
     # Prepare ourselves to have pretty console color
     colorama.init()
 
@@ -29,22 +147,49 @@ def run(
                         type=int,
                         default=None,
                         help="The expected result (used for testing to ensure the solution is working properly).")
+    parser.add_argument("--variant",
+                        default=REFERENCE_VARIANT,
+                        help="Which implementation of the part would you like to run? Use '{}' to run all of them "
+                             "and compare their results and durations. The default is '{}'.".format(ALL_VARIANTS, REFERENCE_VARIANT))
+    parser.add_argument("--memory",
+                        action="store_true",
+                        help="Report the peak memory used and the size of the objects the solution created (note that "
+                             "this slows the solution down).")
+    for option in options:
+        parser.add_argument(option.flag,
+                            type=option.type,
+                            default=option.default,
+                            help="{} The default is '{}'.".format(option.help, option.default) if option.default is not None else option.help)
 
     args = parser.parse_args()
+    option_values = {option.dest: getattr(args, option.dest) for option in options}
+    variants = VARIANTS[module_name][args.part]
+    if args.variant != ALL_VARIANTS and args.variant not in variants:
+        parser.error("argument --variant: invalid choice: '{}' (choose from {})".format(
+            args.variant,
+            ", ".join("'{}'".format(name) for name in [*variants, ALL_VARIANTS])))
+
     with args.input:
-        if args.part == 2:
-            run_part = part2_func
-        else:
-            run_part = part1_func
+        if args.variant == ALL_VARIANTS:
+            __run_all_variants(variants, args.input, args.expected, option_values)
+            return
+
+        run_part = variants[args.variant]
+        if args.memory:
+            models = __start_memory_report()
 
         # For funsies, we'll also time out how long it took to invoke the function.
         started_at = time.time()
         try:
-            result = run_part(args.input)
+            result = __run_part(run_part, args.input, option_values)
         except Exception as e:
             result = e
         ended_at = time.time()
 
+        if args.memory:
+            (_, peak_memory) = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
         # Now print out a summary!
         duration = ended_at - started_at
         print()
@@ -68,3 +213,340 @@ def run(
 
             if args.expected is not None:
                 print(Fore.LIGHTBLUE_EX + "[👀] Expected:\t" + Style.BRIGHT + str(args.expected), Style.RESET_ALL)
+
+        # How did our caches do?
+        for memoized in MEMOS:
+            if memoized.calls > 0:
+                print(Fore.MAGENTA + "[🧠] Memo:\t" + str(memoized), Style.RESET_ALL)
+
+        # How much memory did we use?
+        if args.memory:
+            print(Fore.CYAN + "[💾] Peak Memory:\t{0:,} bytes".format(peak_memory), Style.RESET_ALL)
+            for model in models:
+                print(Fore.CYAN + "[💾] " + __describe_model_memory(model), Style.RESET_ALL)
+
+class Memo:
+    """Caches the results of `func` (which should be a pure function), evicting the least recently
+    used result once more than `maxsize` results are cached. Use `memo()` to create one."""
+    def __init__(self, func: typing.Callable, maxsize: int, typed: bool):
+        if maxsize <= 0:
+            raise ValueError("The maxsize of a memo must be positive.")
+
+        self.func = func
+        self.maxsize = maxsize
+        self.typed = typed
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__cache = collections.OrderedDict()
+
+        # Solutions can be run on several threads at once (see `python -m advent2021`), so make
+        # sure they don't trip over each other when updating the cache.
+        self.__lock = threading.Lock()
+        functools.update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        key = self.__make_key(args, kwargs)
+        with self.__lock:
+            if key in self.__cache:
+                self.hits += 1
+                self.__cache.move_to_end(key)
+                return self.__cache[key]
+            self.misses += 1
+
+        # NOTE: We don't hold on to the lock while calling the function (in case it takes a while or
+        #       calls back into itself), so two threads could end up computing the same result.
+        result = self.func(*args, **kwargs)
+        with self.__lock:
+            self.__cache[key] = result
+            self.__cache.move_to_end(key)
+            while len(self.__cache) > self.maxsize:
+                self.__cache.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def __get__(self, instance, owner):
+        # Allow methods to be memoized as well (the instance becomes part of the key).
+        return self if instance is None else functools.partial(self, instance)
+
+    @property
+    def calls(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.calls if self.calls > 0 else 0.0
+
+    def cache_clear(self):
+        """Empties the cache and resets the statistics."""
+        with self.__lock:
+            self.__cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __make_key(self, args: tuple, kwargs: dict) -> tuple:
+        key = args
+        if kwargs:
+            key += (Memo,) + tuple(sorted(kwargs.items()))
+        if self.typed:
+            # Treat arguments that are equal but of different types (e.g., 1 and 1.0) separately.
+            key += tuple(type(arg) for arg in args) + tuple(type(value) for (_, value) in sorted(kwargs.items()))
+        return key
+
+    def __str__(self):
+        return "{}: {} hits, {} misses, {} evictions ({:.1%} hit rate)".format(
+            self.func.__qualname__, self.hits, self.misses, self.evictions, self.hit_rate)
+
+def memo(func: typing.Optional[typing.Callable] = None, *, maxsize: int = 1024, typed: bool = False):
+    """Memoizes the decorated function, keeping (at most) the `maxsize` most recently used results.
+
+    If `typed` is `True`, arguments of different types are cached separately (e.g., `f(1)` and
+    `f(1.0)`). The hits, misses, and evictions of the cache are printed in the summary, so we can
+    tell whether caching the function is actually worth it. Can be used as `@memo` or, to change
+    the defaults, `@memo(maxsize=..., typed=...)`."""
+    def decorator(func: typing.Callable) -> Memo:
+        memoized = Memo(func, maxsize, typed)
+        MEMOS.append(memoized)
+        return memoized
+
+    return decorator(func) if func is not None else decorator
+
+def track_memory(cls: type) -> type:
+    """Registers `cls` as one of the classes a solution models its data with, so that running with
+    `--memory` reports how many bytes each of its objects take up (along with how many bytes they
+    would take up if they kept their attributes in a `__dict__` instead of `__slots__`)."""
+    TRACKED_MODELS.append(cls)
+    return cls
+
+def sizeof(obj: typing.Any) -> int:
+    """Gets the number of bytes taken up by `obj`, including the attributes and items it holds on
+    to (but not other tracked objects it refers to, e.g., a node's neighbors)."""
+    return __sizeof(obj, set())
+
+@dataclass
+class ModelMemory:
+    """How many objects of a tracked class were created (and the first one that was, so that we can
+    measure how big they are)."""
+    cls: type
+    count: int = 0
+    sample: typing.Any = None
+
+class __DictBacked:
+    pass
+
+@dataclass
+class VariantResult:
+    """The outcome of running a single variant of a part."""
+    name: str
+    result: typing.Any
+    duration: float
+
+    @property
+    def failed(self) -> bool:
+        return isinstance(self.result, Exception)
+
+def __register(module_name: str, part: int, name: str, func: PartFunc):
+    parts = VARIANTS.setdefault(module_name, {1: {}, 2: {}})
+    if name in parts[part] and parts[part][name] is not func:
+        raise ValueError("A variant named '{}' has already been registered for part {} of {}.".format(name, part, module_name))
+    parts[part][name] = func
+
+def __run_part(run_part: PartFunc, file: typing.TextIO, option_values: typing.Dict[str, typing.Any]):
+    # Only pass along the options that the part actually takes.
+    parameters = inspect.signature(run_part).parameters
+    return run_part(file, **{name: value for (name, value) in option_values.items() if name in parameters})
+
+def __run_all_variants(
+    variants: typing.Dict[str, PartFunc],
+    file: typing.TextIO,
+    expected: typing.Optional[int],
+    option_values: typing.Dict[str, typing.Any]):
+    # Every variant needs to read the same input from the start. If we can't rewind the file (e.g.,
+    # we're reading from STDIN), keep a copy of it in memory instead.
+    if not file.seekable():
+        file = io.StringIO(file.read())
+
+    # The reference implementation always goes first, since it's what everyone else is compared to.
+    names = sorted(variants, key=lambda name: name != REFERENCE_VARIANT)
+    outcomes = []
+    for name in names:
+        # Start everyone off with cold caches, so no variant benefits from what an earlier one
+        # memoized.
+        for memoized in MEMOS:
+            memoized.cache_clear()
+
+        file.seek(0)
+        started_at = time.perf_counter()
+        try:
+            result = __run_part(variants[name], file, option_values)
+        except Exception as e:
+            result = e
+        outcomes.append(VariantResult(name, result, time.perf_counter() - started_at))
+
+    # All the variants should agree with each other. We'll use the reference result (or, if that
+    # blew up, the first variant that didn't) as the answer the rest should match.
+    baseline = next((outcome for outcome in outcomes if not outcome.failed), None)
+    agreed = baseline is not None and all(not o.failed and o.result == baseline.result for o in outcomes)
+
+    # Now print out a summary!
+    print()
+    print("The results are in!")
+    if not agreed:
+        print(Fore.RED + Style.BRIGHT + "[❌] Variants Disagreed" + Style.RESET_ALL)
+    elif expected is not None and baseline.result != expected:
+        print(Fore.YELLOW + Style.BRIGHT + "[⚠️ ] Variants Agreed with Unexpected Result" + Style.RESET_ALL)
+    elif expected is not None:
+        print(Fore.GREEN + Style.BRIGHT + "[✅] Variants Agreed with Expected Result" + Style.RESET_ALL)
+    else:
+        print(Fore.GREEN + Style.BRIGHT + "[✅] Variants Agreed" + Style.RESET_ALL)
+
+    name_width = max(len("Variant"), *(len(name) for name in names))
+    print(Fore.BLUE + "{0:<{1}}  {2:>14}  {3:>9}  {4}".format("Variant", name_width, "Duration", "Speed-up", "Result") + Style.RESET_ALL)
+    for outcome in outcomes:
+        if outcome.failed:
+            color = Fore.RED
+            result = "{}: {}".format(type(outcome.result).__name__, outcome.result)
+        else:
+            color = Fore.GREEN if outcome.result == baseline.result else Fore.RED
+            result = str(outcome.result)
+
+        # The speed-up is always relative to the reference implementation.
+        speed_up = outcomes[0].duration / outcome.duration if outcome.duration > 0 else float("inf")
+        print(color + "{0:<{1}}  {2:>12.6f} s  {3:>8.2f}×  {4}".format(outcome.name, name_width, outcome.duration, speed_up, result) + Style.RESET_ALL)
+
+    if expected is not None:
+        print(Fore.LIGHTBLUE_EX + "[👀] Expected:\t" + Style.BRIGHT + str(expected), Style.RESET_ALL)
+
+    # Show what went wrong for the variants that blew up.
+    for outcome in outcomes:
+        if outcome.failed:
+            print(Fore.YELLOW + "[❌] Exception ({}): ".format(outcome.name) + Style.RESET_ALL)
+            traceback.print_exception(type(outcome.result), outcome.result, outcome.result.__traceback__)
+
+def read_ints(file: typing.IO) -> array:
+    """Reads every integer in `file` (from wherever it's currently at until the end) into an
+    `array('q')`.
+
+    The integers can be separated by anything that isn't a digit, so this works for comma-separated
+    (`3,4,3,1,2`), whitespace-separated (`3   4`), and `a,b -> c,d` inputs alike. The input is
+    scanned as bytes, a chunk at a time, so a single (very long) line is never held in memory as
+    a `str`."""
+    numbers = array("q")
+    for chunk in __read_token_chunks(file):
+        numbers.extend(map(int, __INTEGER_TOKEN.findall(chunk)))
+    return numbers
+
+def read_int_rows(file: typing.IO) -> typing.List[array]:
+    """Reads the integers in `file` (from wherever it's currently at until the end) line by line,
+    returning an `array('q')` for each line. Blank lines are kept (as empty arrays) so inputs that
+    use them as separators can still tell where one group ends and the next begins."""
+    rows = []
+    carry = b""
+    for chunk in __read_byte_chunks(file):
+        lines = (carry + chunk).split(b"\n")
+        carry = lines.pop()
+        rows.extend(array("q", map(int, __INTEGER_TOKEN.findall(line))) for line in lines)
+
+    # Don't forget the last line (if the file doesn't end with a newline)!
+    if carry.strip():
+        rows.append(array("q", map(int, __INTEGER_TOKEN.findall(carry))))
+    return rows
+
+__INTEGER_TOKEN = re.compile(rb"-?\d+")
+
+def __read_byte_chunks(file: typing.IO) -> typing.Iterator[bytes]:
+    # Files opened in text mode (e.g., via `--input`) hand us back a `str`, so turn it back into
+    # bytes. Going through the text layer (rather than `file.buffer`) keeps us from skipping past
+    # whatever the text layer has already buffered (e.g., if the caller `readline()`'d a header).
+    text_mode = isinstance(file, io.TextIOBase)
+    while True:
+        chunk = file.read(TOKEN_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk.encode("ascii") if text_mode else chunk
+
+def __read_token_chunks(file: typing.IO) -> typing.Iterator[bytes]:
+    # A chunk can end in the middle of a number, so hold on to any trailing digits (and sign) and
+    # glue them onto the front of the next chunk.
+    carry = b""
+    for chunk in __read_byte_chunks(file):
+        chunk = carry + chunk
+        head = chunk.rstrip(b"-0123456789")
+        carry = chunk[len(head):]
+        yield head
+    yield carry
+
+def __start_memory_report() -> typing.List[ModelMemory]:
+    # Keep count of the objects each tracked class creates (holding on to the first one, so we can
+    # measure it once we're done), then start tracing our allocations.
+    models = []
+    for cls in TRACKED_MODELS:
+        model = ModelMemory(cls)
+        cls.__init__ = __counting_init(cls.__init__, model)
+        models.append(model)
+
+    tracemalloc.start()
+    return models
+
+def __describe_model_memory(model: ModelMemory) -> str:
+    if model.sample is None:
+        return "{}: no objects created".format(model.cls.__qualname__)
+
+    # How big would the object have been if it kept its attributes in a __dict__ (rather than in
+    # __slots__)? Figure that out by copying its attributes over to an object that does.
+    bytes_per_object = sizeof(model.sample)
+    if hasattr(model.sample, "__dict__"):
+        bytes_per_dict_object = bytes_per_object
+    else:
+        equivalent = __DictBacked()
+        for name in __slot_names(model.cls):
+            if hasattr(model.sample, name):
+                setattr(equivalent, name, getattr(model.sample, name))
+        bytes_per_dict_object = sizeof(equivalent)
+
+    return "{}:\t{:,} objects × {:,} bytes ({:,} bytes with a __dict__)".format(
+        model.cls.__qualname__, model.count, bytes_per_object, bytes_per_dict_object)
+
+def __counting_init(init: typing.Callable, model: ModelMemory) -> typing.Callable:
+    @functools.wraps(init)
+    def counting_init(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        model.count += 1
+        if model.sample is None:
+            model.sample = self
+    return counting_init
+
+def __slot_names(cls: type) -> typing.List[str]:
+    names = []
+    for klass in cls.__mro__:
+        slots = vars(klass).get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return [name for name in names if name not in ("__dict__", "__weakref__")]
+
+def __sizeof(obj: typing.Any, seen: typing.Set[int]) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    # Enum members (and the like) are singletons shared by everyone, so they don't count.
+    if isinstance(obj, (enum.Enum, type, type(None))):
+        return 0
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, array, int, float)):
+        # These don't hold on to anything else (an array's getsizeof already includes its buffer).
+        return size
+    if isinstance(obj, dict):
+        return size + sum(__sizeof(key, seen) + __sizeof(value, seen) for (key, value) in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        # Don't count other tracked objects (e.g., a node's neighbors), they're counted on their own.
+        return size + sum(__sizeof(item, seen) for item in obj if type(item) not in TRACKED_MODELS)
+
+    # Must be an object, so count its attributes, whether they're in a __dict__ or in __slots__.
+    # NOTE: The attribute names are shared by every object of the class, so they aren't counted.
+    values = [getattr(obj, name) for name in __slot_names(type(obj)) if hasattr(obj, name)]
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(vars(obj))
+        values.extend(vars(obj).values())
+    return size + sum(__sizeof(value, seen) for value in values if type(value) not in TRACKED_MODELS)
@@ -1,6 +1,10 @@
+import collections
 import os
 import sys
-from advent2021.core import run
+from advent2021.core import Option, np, positive_int, read_ints, run, variant
+
+# By default, Part 2 sums up measurements in groups of three.
+DEFAULT_WINDOW = 3
 
 def part1(input_fp):
     previous_measurement = None
@@ -21,39 +25,70 @@ def part1(input_fp):
     # Print our result :)
     return increase_count
 
-def part2(input_fp):
+def part2(input_fp, window=DEFAULT_WINDOW):
     previous_measurement = None
     increase_count = 0
-    window = []
 
-    # Now we're reading in groups of three (a three-measurement window) that is all summed
-    # together. :-)
+    # The measurements in our window (the oldest one falls out when a new one comes in), and their
+    # sum, which we keep up to date as measurements come and go rather than summing the whole window
+    # over and over again.
+    measurements = collections.deque(maxlen=window)
+    current_measurement = 0
+
+    # Now we're reading in groups of three (a three-measurement window, or however big `window` is)
+    # that is all summed together. :-)
     for line in input_fp:
-        if len(window) < 3:
-            # Append the number until we reached three (we're still building our summation window) :)
-            window.append(int(line))
+        measurement = int(line)
+        if len(measurements) == window:
+            current_measurement -= measurements[0]
+        measurements.append(measurement)
+        current_measurement += measurement
+        if len(measurements) < window:
+            # We're still building our summation window :)
             continue
 
-        # We've build our window! First, sum it.
-        current_measurement = sum(window)
-
-        # Then, compare with the previous measurement (if we can't, ignore)
+        # We've built our window! Compare its sum with the previous one (if we can't, ignore)
         if previous_measurement is not None and previous_measurement < current_measurement:
             # It's an increase, so go ahead and increment. :)
             increase_count += 1
 
-
-        # Set the current to be our previous (in preparation for the next), shift our list, and
-        # insert the next line we've read (so we can sum it later)
+        # Set the current to be our previous (in preparation for the next)
         previous_measurement = current_measurement
-        (window[0], window[1], window[2]) = (window[1], window[2], int(line))
-
-    # Don't forget our last window!
-    current_measurement = sum(window)
-    if previous_measurement < current_measurement:
-        increase_count += 1
 
     # Print our result :-)
     return increase_count
 
-run(__package__, part1, part2)
+@variant(2, "deque")
+def part2_deque(input_fp, window=DEFAULT_WINDOW):
+    # Two windows next to each other share all but one measurement, i.e., comparing
+    # a[i - K + 1] + ... + a[i] against a[i - K] + ... + a[i - 1] is the same as comparing a[i] against
+    # a[i - K]. So all we need to do is remember the last K measurements (a ring buffer will do) and
+    # compare the measurement coming in with the one that's about to fall out--no summing needed.
+    #
+    # That's O(1) work per line and O(K) memory, so the input can be as long as we want (e.g., piped
+    # in through STDIN with `--input -`).
+    measurements = collections.deque(maxlen=window)
+    increase_count = 0
+    for line in input_fp:
+        current_measurement = int(line)
+        if len(measurements) == window and measurements[0] < current_measurement:
+            increase_count += 1
+
+        # Since the deque has a maxlen, appending pushes the oldest measurement out for us. :)
+        measurements.append(current_measurement)
+
+    return increase_count
+
+@variant(2, "numpy", available=np is not None)
+def part2_numpy(input_fp, window=DEFAULT_WINDOW):
+    # Same trick as above, except we're reading all the measurements into memory and comparing
+    # a[K:] against a[:-K] all at once.
+    measurements = np.frombuffer(read_ints(input_fp), dtype=np.int64)
+    return int(np.count_nonzero(measurements[window:] > measurements[:-window]))
+
+run(__package__, part1, part2, options=[
+    Option("--window",
+           type=positive_int,
+           default=DEFAULT_WINDOW,
+           help="How many measurements are summed together in Part 2."),
+])
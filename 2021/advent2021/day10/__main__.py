@@ -1,6 +1,7 @@
+import heapq
 import sys
 import typing
-from advent2021.core import run
+from advent2021.core import run, variant
 
 PAIRS = [
     ("(", ")"),
@@ -11,6 +12,15 @@ PAIRS = [
 BEGINNING_PAIR = [pair[0] for pair in PAIRS]
 ENDING_PAIR = [pair[1] for pair in PAIRS]
 
+# The same thing as lookup tables, indexed by the byte of a bracket: the closing bracket of each
+# opening one (or 0), whether a byte is a closing bracket, the points a closing bracket is worth when
+# it's the one that corrupts a line (Part 1), and the points it's worth when completing a line
+# (Part 2).
+CLOSING_OF = tuple(next((ord(end) for (begin, end) in PAIRS if ord(begin) == byte), 0) for byte in range(256))
+IS_CLOSING = tuple(any(ord(end) == byte for (_, end) in PAIRS) for byte in range(256))
+ERROR_POINTS = tuple({")": 3, "]": 57, "}": 1197, ">": 25137}.get(chr(byte), 0) for byte in range(256))
+COMPLETION_POINTS = bytes.maketrans(b")]}>", bytes([1, 2, 3, 4]))
+
 def run_part1(file: typing.TextIO) -> int:
     POINTS = {
         ")": 3,
@@ -38,7 +48,7 @@ def run_part1(file: typing.TextIO) -> int:
                 if PAIRS[index][1] != bracket:
                     print("Error! Expected", PAIRS[index][1], "but got", bracket, "for a total of", POINTS[bracket], "points!", file=sys.stderr)
                     points += POINTS[bracket]
-                    continue
+                    break
 
     return points
 
@@ -107,4 +117,67 @@ def run_part2(file: typing.TextIO) -> int:
     print(len(scores), scores)
     return scores[len(scores) // 2]
 
+@variant(1, "table")
+def run_part1_table(file: typing.TextIO) -> int:
+    points = 0
+    for line in file:
+        (illegal, _) = __validate(line.encode("ascii"))
+        if illegal is not None:
+            points += ERROR_POINTS[illegal]
+    return points
+
+@variant(2, "table")
+def run_part2_table(file: typing.TextIO) -> int:
+    # Rather than collecting (and sorting) all the scores, keep the lower half of the scores we've
+    # seen so far in one heap (a max-heap, so its scores are negated) and the upper half in another,
+    # which always has the middle score on top.
+    lower_half: typing.List[int] = []
+    upper_half: typing.List[int] = []
+    for line in file:
+        (illegal, unclosed) = __validate(line.encode("ascii"))
+        if illegal is not None:
+            continue
+
+        # The brackets we'd have to add are the closing brackets of the unclosed ones, innermost
+        # first. The score treats them as the digits of a base-5 number.
+        score = __base5_value(unclosed[::-1].translate(COMPLETION_POINTS))
+        heapq.heappush(upper_half, -heapq.heappushpop(lower_half, -score))
+        if len(upper_half) > len(lower_half) + 1:
+            heapq.heappush(lower_half, -heapq.heappop(upper_half))
+
+    return upper_half[0]
+
+def __validate(line: bytes) -> typing.Tuple[typing.Optional[int], bytearray]:
+    # Returns the first illegal closing bracket of the line (if it's corrupted), and the closing
+    # brackets that are still owed, outermost first. The stack is a bytearray (one byte per level),
+    # so even a line that's nested millions of levels deep is no problem.
+    expected = bytearray()
+    for byte in line:
+        closing = CLOSING_OF[byte]
+        if closing:
+            expected.append(closing)
+        elif IS_CLOSING[byte]:
+            if not expected or expected.pop() != byte:
+                return (byte, expected)
+    return (None, expected)
+
+def __base5_value(digits: bytes, powers: typing.Optional[typing.Dict[int, int]] = None) -> int:
+    # Same as going through the digits with score = score * 5 + digit, but that's quadratic once the
+    # score gets really big (i.e., for deeply nested lines), so split the digits in half and combine
+    # the values of both halves instead. (The halves on each level are about the same length, so the
+    # powers of 5 we need to shift them by are shared.)
+    if len(digits) <= 64:
+        value = 0
+        for digit in digits:
+            value = value * 5 + digit
+        return value
+
+    if powers is None:
+        powers = {}
+    middle = len(digits) // 2
+    shift = len(digits) - middle
+    if shift not in powers:
+        powers[shift] = 5 ** shift
+    return __base5_value(digits[:middle], powers) * powers[shift] + __base5_value(digits[middle:], powers)
+
 run(__package__, run_part1, run_part2)
@@ -1,6 +1,6 @@
 import sys
 import typing
-from advent2021.core import run
+from advent2021.core import np, run, variant
 
 def run_part1(file: typing.TextIO) -> int:
     MAX_STEPS = 100
@@ -179,6 +179,143 @@ def run_part2(file: typing.TextIO) -> int:
 
     return step
 
+@variant(1, "numpy", available=np is not None)
+def run_part1_numpy(file: typing.TextIO) -> int:
+    MAX_STEPS = 100
+
+    octopuses = __read_octopuses_numpy(file)
+    return sum(__step_numpy(octopuses) for step in range(MAX_STEPS))
+
+@variant(2, "numpy", available=np is not None)
+def run_part2_numpy(file: typing.TextIO) -> int:
+    octopuses = __read_octopuses_numpy(file)
+    step = 1
+    while __step_numpy(octopuses) != octopuses.size:
+        step += 1
+    return step
+
+def __read_octopuses_numpy(file: typing.TextIO) -> "np.ndarray":
+    # The energy levels never go past 9 + 1 (for the step) + 8 (for all of the neighbors flashing),
+    # so a byte per octopus is plenty.
+    rows = [[int(energy) for energy in row if energy.isnumeric()] for row in file]
+    return np.array([row for row in rows if row], dtype=np.uint8)
+
+def __step_numpy(octopuses: "np.ndarray") -> int:
+    # Same as a step of Part 1, but for every octopus at once: charge everyone up, and then flash
+    # every octopus that's over 9 (that hasn't flashed yet) in "waves", where each wave charges up
+    # the neighbors of the octopuses that just flashed (which might make them flash in the next one).
+    octopuses += 1
+    flashed = np.zeros(octopuses.shape, dtype=bool)
+    neighbors = np.zeros((octopuses.shape[0] + 2, octopuses.shape[1] + 2), dtype=np.uint8)
+    while True:
+        flashing = (octopuses > 9) & ~flashed
+        if not flashing.any():
+            break
+        flashed |= flashing
+
+        # Count how many of each octopus's neighbors (diagonals included) are flashing by adding up
+        # the flashes shifted in each of the 8 directions. The extra row/column around the edges is
+        # where the flashes "past" the edge of the grid go (and are then ignored).
+        neighbors.fill(0)
+        flashes = flashing.view(np.uint8)
+        (rows, cols) = octopuses.shape
+        for row_shift in (0, 1, 2):
+            for col_shift in (0, 1, 2):
+                if row_shift != 1 or col_shift != 1:
+                    neighbors[row_shift:row_shift + rows, col_shift:col_shift + cols] += flashes
+        octopuses += neighbors[1:-1, 1:-1]
+
+    # Everyone who flashed used up all their energy.
+    octopuses[flashed] = 0
+    return int(flashed.sum())
+
+@variant(1, "bitboard")
+def run_part1_bitboard(file: typing.TextIO) -> int:
+    MAX_STEPS = 100
+
+    octopuses = Bitboard.read(file)
+    return sum(octopuses.step() for step in range(MAX_STEPS))
+
+@variant(2, "bitboard")
+def run_part2_bitboard(file: typing.TextIO) -> int:
+    octopuses = Bitboard.read(file)
+    step = 1
+    while octopuses.step() != octopuses.count:
+        step += 1
+    return step
+
+class Bitboard:
+    """A grid of octopuses, simulated with bitwise operations on big ints."""
+
+    # The whole grid of octopuses as a handful of (big) ints: octopus (row, col) is bit
+    # row * (width + 1) + col of each of them. Each row has an extra (always empty) column at the end
+    # of it, so shifting the bits over to a neighbor never wraps around from one row into the next.
+    #
+    # The energy levels are stored as bit "planes": bit i of an octopus's energy level is its bit in
+    # the i-th plane. That way, we can charge up *every* octopus with a few bitwise operations (the
+    # same way an adder in a CPU adds two numbers), no matter how big the grid is.
+    def __init__(self, rows: typing.List[str]):
+        self.stride = len(rows[0]) + 1
+        self.count = len(rows) * len(rows[0])
+
+        # Build each plane (and the board of where the octopuses are) as a string of bits, with the
+        # last octopus first (the highest bit). The extra column is an octopus with no energy.
+        grid = "".join(row + "0" for row in rows)[::-1]
+        self.board = int(("0" + "1" * len(rows[0])) * len(rows), 2)
+        self.planes = [int("".join(str((int(energy) >> plane) & 1) for energy in grid), 2) for plane in range(4)]
+
+    @classmethod
+    def read(cls, file: typing.TextIO):
+        return cls([row for row in (line.strip() for line in file) if row])
+
+    def step(self) -> int:
+        """Runs a step, returning how many octopuses flashed."""
+        # Charge everyone up by 1 (i.e., add 1 to every octopus's energy level, one bit plane at a
+        # time). The energy levels can go up to 9 + 1 + 8 = 18 during a step, so we need a fifth plane
+        # until the step is over.
+        (e0, e1, e2, e3) = self.planes
+        carry = self.board
+        (e0, carry) = (e0 ^ carry, e0 & carry)
+        (e1, carry) = (e1 ^ carry, e1 & carry)
+        (e2, carry) = (e2 ^ carry, e2 & carry)
+        (e3, e4) = (e3 ^ carry, e3 & carry)
+
+        # 10 is 0b01010, so a (five bit) energy level is at least 10 if it's at least 16, or if it's at
+        # least 8 *and* has the 2 or the 4 bit set.
+        flashed = 0
+        flashing = e4 | (e3 & (e2 | e1))
+        shifts = (1, self.stride - 1, self.stride, self.stride + 1)
+        while flashing:
+            flashed |= flashing
+
+            # Count how many neighbors (diagonals included) of each octopus are flashing, by adding up
+            # the flashing octopuses shifted over in each of the 8 directions (the count can't go past
+            # 8, so it takes 4 bits: n0 through n3).
+            n0 = n1 = n2 = n3 = 0
+            for shift in shifts:
+                for neighbor in (flashing << shift, flashing >> shift):
+                    carry = n0 & neighbor
+                    n0 ^= neighbor
+                    (n1, carry) = (n1 ^ carry, n1 & carry)
+                    (n2, carry) = (n2 ^ carry, n2 & carry)
+                    n3 |= carry
+
+            # Only the octopuses that haven't flashed yet get charged up by their neighbors.
+            charging = self.board & ~flashed
+            (n0, n1, n2, n3) = (n0 & charging, n1 & charging, n2 & charging, n3 & charging)
+            (e0, carry) = (e0 ^ n0, e0 & n0)
+            (e1, carry) = (e1 ^ n1 ^ carry, (e1 & n1) | (carry & (e1 ^ n1)))
+            (e2, carry) = (e2 ^ n2 ^ carry, (e2 & n2) | (carry & (e2 ^ n2)))
+            (e3, carry) = (e3 ^ n3 ^ carry, (e3 & n3) | (carry & (e3 ^ n3)))
+            e4 |= carry
+            flashing = (e4 | (e3 & (e2 | e1))) & ~flashed
+
+        # Everyone who flashed used up all their energy (which also means everyone's back to 9 or
+        # less, so the fifth plane is empty again).
+        unflashed = ~flashed
+        self.planes = [e0 & unflashed, e1 & unflashed, e2 & unflashed, e3 & unflashed]
+        return flashed.bit_count()
+
 def __charge_octopus_at(grid, row, col):
     # If the row and column exceeds the dimension of the grid, return None
     if row < 0 or row >= len(grid):
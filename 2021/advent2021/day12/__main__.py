@@ -4,7 +4,7 @@ import re
 import sys
 from typing import List, Tuple, Dict
 import typing
-from advent2021.core import run
+from advent2021.core import run, track_memory
 
 class NodeType(Enum):
     START = 0
@@ -33,7 +33,8 @@ class NodeType(Enum):
         # We don't know how to classify this node
         raise NotImplementedError(f"Unable to classify node {name}")
 
-@dataclass
+@track_memory
+@dataclass(slots=True)
 class Node:
     name: str
     node_type: NodeType
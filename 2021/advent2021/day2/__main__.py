@@ -1,6 +1,11 @@
 import os
 import sys
-from advent2021.core import run
+from advent2021.core import np, run, variant
+
+# The commands are told apart by their first letter.
+FORWARD = ord("f")
+DOWN = ord("d")
+UP = ord("u")
 
 def part1(input_fp):
     # We're interested in these two numbers as we're reading each line:
@@ -52,4 +57,56 @@ def part2(input_fp):
     # Get our result (multiply!)
     return d_pos * h_pos
 
+@variant(1, "numpy", available=np is not None)
+def part1_numpy(input_fp):
+    # Rather than going through the commands one by one, sum up the units of each kind of command
+    # all at once.
+    (directions, units) = __parse_commands(input_fp)
+    h_pos = int(units[directions == FORWARD].sum())
+    d_pos = int(units[directions == DOWN].sum()) - int(units[directions == UP].sum())
+    return d_pos * h_pos
+
+@variant(2, "numpy", available=np is not None)
+def part2_numpy(input_fp):
+    (directions, units) = __parse_commands(input_fp)
+    forward = np.where(directions == FORWARD, units, 0)
+
+    # Our aim after each command is the running total of the downs (minus the ups) so far, and each
+    # forward takes us `aim * unit` deeper.
+    aim = np.cumsum(np.where(directions == DOWN, units, 0) - np.where(directions == UP, units, 0))
+
+    # NOTE: The depth could get big enough to overflow an int64 (with enough commands). If it could,
+    #       fall back to Python's ints (much slower, but exact).
+    if int(np.abs(aim).max(initial=0)) * int(forward.sum()) >= 2 ** 63:
+        (aim, forward) = (aim.astype(object), forward.astype(object))
+    d_pos = int(np.dot(aim, forward))
+
+    h_pos = int(forward.sum())
+    return d_pos * h_pos
+
+def __parse_commands(input_fp):
+    # Parse the commands into two arrays: the first letter of each command (to tell them apart) and
+    # its unit.
+    data = input_fp.read().encode("ascii")
+    buffer = np.frombuffer(data, dtype=np.uint8)
+
+    # Each command starts right after a newline (or at the very beginning), skipping blank lines.
+    line_starts = np.concatenate(([0], np.flatnonzero(buffer == ord("\n")) + 1))
+    line_starts = line_starts[line_starts < len(buffer)]
+    directions = buffer[line_starts]
+    directions = directions[directions != ord("\n")]
+
+    # The units are the only numbers in there, i.e., each run of digits is a unit. Figure out the
+    # value of each digit (based off how far it is from the end of its run) and add the digits of
+    # each run together.
+    is_digit = (buffer >= ord("0")) & (buffer <= ord("9"))
+    run_starts = is_digit & ~np.concatenate(([False], is_digit[:-1]))
+    run_ends = np.flatnonzero(is_digit & ~np.concatenate((is_digit[1:], [False])))
+    digit_positions = np.flatnonzero(is_digit)
+    first_digits = run_starts[digit_positions]
+    places = run_ends[np.cumsum(first_digits) - 1] - digit_positions
+    digits = (buffer[digit_positions] - ord("0")).astype(np.int64) * (10 ** places)
+    units = np.add.reduceat(digits, np.flatnonzero(first_digits)) if len(digits) > 0 else digits
+    return (directions, units)
+
 run(__package__, part1, part2)
@@ -1,6 +1,7 @@
+import bisect
 import itertools
 import os
-from advent2021.core import run
+from advent2021.core import np, run, variant
 
 SCRIPT_DIR = os.path.dirname(__file__)
 INPUT_FILE = "input.txt"
@@ -50,6 +51,61 @@ def part1(input_fp):
     # Now get our result--the power consumption (multiplication of gamma and epsilon)
     return gamma_rate * epsilon_rate
 
+@variant(1, "packed")
+def part1_packed(input_fp):
+    # Parse each line into an integer once, and count the ones in every column at the same time with
+    # a "bit-sliced" counter: counters[k] holds bit k of the count of every column (column i of the
+    # count is bit i of each of the counters). Adding a number to the count is then just like adding
+    # by hand--XOR to add, AND to carry--except it's done for every column at once, and it works for
+    # numbers of any width (Python's ints don't stop at 64 bits).
+    counters = []
+    line_count = 0
+    bit_count = 0
+    for line in input_fp:
+        line = line.strip()
+        if not line:
+            continue
+
+        bit_count = max(bit_count, len(line))
+        line_count += 1
+        carry = int(line, 2)
+        for (k, counter) in enumerate(counters):
+            (counters[k], carry) = (counter ^ carry, counter & carry)
+            if not carry:
+                break
+        if carry:
+            counters.append(carry)
+
+    # Now pull the count of ones out of each column. A "1" is the most common bit if it appears at
+    # least as much as a "0" (i.e., in at least half of the numbers).
+    gamma_rate = 0
+    for column in range(bit_count):
+        one_count = sum(((counter >> column) & 1) << k for (k, counter) in enumerate(counters))
+        if one_count * 2 >= line_count:
+            gamma_rate |= 1 << column
+
+    # The epsilon rate is the gamma rate flipped (within the number of bits we're working with).
+    epsilon_rate = ~gamma_rate & ((1 << bit_count) - 1)
+    return gamma_rate * epsilon_rate
+
+@variant(1, "numpy", available=np is not None)
+def part1_numpy(input_fp):
+    # Read the whole report into a (numbers × bits) matrix of bytes, and count the ones in each
+    # column by summing the columns. NOTE: This relies on every number having the same width (which
+    # the diagnostic report does), so that each row of the matrix is exactly one line.
+    data = input_fp.read().encode("ascii")
+    bit_count = data.index(b"\n") if b"\n" in data else len(data.strip())
+    if not data.endswith(b"\n"):
+        data += b"\n"
+    report = np.frombuffer(data, dtype=np.uint8).reshape(-1, bit_count + 1)[:, :bit_count]
+    one_counts = np.count_nonzero(report == ord("1"), axis=0)
+
+    # NOTE: Build the rates with Python's ints (rather than NumPy's) in case we have more than 64 bits.
+    most_common = (one_counts * 2 >= len(report))
+    gamma_rate = int("".join("1" if bit else "0" for bit in most_common), 2)
+    epsilon_rate = ~gamma_rate & ((1 << bit_count) - 1)
+    return gamma_rate * epsilon_rate
+
 
 def part2(input_fp):
     numbers = []
@@ -119,6 +175,53 @@ def part2(input_fp):
     # Finally, figure out the life support rating of the submarine by multiplying those two numbers.
     return __bin2dec(co2_scrubber_rating) * __bin2dec(oxygen_generator_rating_binary)
 
+@variant(2, "bisect")
+def part2_bisect(input_fp):
+    # Parse each number once and sort them. Once sorted, the numbers that are left after filtering
+    # on the first few bits are always a contiguous range [lo, hi) of the list (they all share the
+    # same leading bits). And within that range, the numbers whose next bit is a 0 all come before
+    # the ones whose next bit is a 1, so a binary search tells us how many of each there are--no
+    # need to build any filtered lists.
+    bit_count = 0
+    numbers = []
+    for line in input_fp:
+        line = line.strip()
+        if line:
+            bit_count = max(bit_count, len(line))
+            numbers.append(int(line, 2))
+    numbers.sort()
+
+    oxygen_generator_rating = __find_rating(numbers, bit_count, keep_most_common=True)
+    co2_scrubber_rating = __find_rating(numbers, bit_count, keep_most_common=False)
+    return oxygen_generator_rating * co2_scrubber_rating
+
+def __find_rating(numbers, bit_count, keep_most_common):
+    (lo, hi) = (0, len(numbers))
+    prefix = 0
+    for bit_pos in range(bit_count - 1, -1, -1):
+        # The first number (in our range) that has this bit set, i.e., the first one that's at least
+        # the leading bits we've kept so far with this bit set.
+        mid = bisect.bisect_left(numbers, prefix | (1 << bit_pos), lo, hi)
+        zero_count = mid - lo
+        one_count = hi - mid
+
+        # Keep the most common bit (1 if it's a tie) or the least common bit (0 if it's a tie).
+        # NOTE: Whenever one side is empty (i.e., all the remaining numbers have the same bit here,
+        #       like 100 and 101 do at bit 2), the range is kept whole. That's different from the
+        #       puzzle's literal rule, which (for the least common bit) would keep the numbers with
+        #       the bit nobody has and empty the list.
+        if one_count == 0 or (zero_count > 0 and (zero_count > one_count) == keep_most_common):
+            hi = mid
+        else:
+            lo = mid
+            prefix |= 1 << bit_pos
+
+        if hi - lo == 1:
+            # We can stop now!
+            break
+
+    return numbers[lo]
+
 def __bin2dec(bits):
     number = 0
     for (bit_pos, bit) in enumerate(bits):
@@ -1,12 +1,24 @@
 from argparse import ArgumentError
+from array import array
+import itertools
 import sys
 import typing
-from advent2021.core import run
+from advent2021.core import np, read_int_rows, read_ints, run, track_memory, variant
 
+@track_memory
 class BingoCard:
     ROW_COUNT = 5
     COL_COUNT = 5
 
+    # The cells are numbered row by row (i.e., the cell at (row, col) is cell 5 × row + col) and a
+    # card wins once all the cells of one of these masks (a row or a column) have been marked.
+    WINNING_MASKS = (
+        tuple(0b11111 << (5 * row) for row in range(5)) +
+        tuple(0b0000100001000010000100001 << col for col in range(5))
+    )
+
+    __slots__ = ("numbers", "marked")
+
     """Represents a 5 × 5 Bingo Card"""
     def __init__(self, board: typing.List[typing.List[int]]):
         # Sanity check. :)
@@ -17,44 +29,33 @@ class BingoCard:
             if len(row) != BingoCard.COL_COUNT:
                 raise ArgumentError("Invalid board. There must be {} columns for all rows.".format(BingoCard.COL_COUNT))
 
-        self.board = board
+        # Rather than keeping the board as a list of lists (and replacing the numbers with None as
+        # they're marked), keep the numbers in a flat array and the marked cells as bits of an int.
+        self.numbers = array("q", itertools.chain.from_iterable(board))
+        self.marked = 0
 
     def mark(self, number_called):
         """Mark the board with the number called."""
-        for row_index in range(BingoCard.ROW_COUNT):
-            for col_index in range(BingoCard.COL_COUNT):
-                if self.board[row_index][col_index] == number_called:
-                    self.board[row_index][col_index] = None # Marked!
-                    break
+        try:
+            self.marked |= 1 << self.numbers.index(number_called) # Marked!
+        except ValueError:
+            pass
 
     def sum(self):
         """Gets the sum of all unmarked numbers that remained on the board"""
         running_sum = 0
-        for row_index in range(BingoCard.ROW_COUNT):
-            for col_index in range(BingoCard.COL_COUNT):
-                number = self.board[row_index][col_index]
-                if number is None:
-                    continue
+        for (index, number) in enumerate(self.numbers):
+            if self.marked & (1 << index):
+                continue
 
-                running_sum += number
+            running_sum += number
         return running_sum
 
     def is_winner(self):
-        """Determines whether the board has won or not"""
-        # First, check to see if we've gotten a horizontal win (i.e., one row has all numbers marked).
-        for row in self.board:
-            total_marked = len([True for col in row if col is None])
-            if total_marked == BingoCard.COL_COUNT:
-                return True
-
-        # To check if we've gotten a vertical win (i.e., one column has all numbers marked), we'll
-        # need to do some "fancy" traversals.
-        for col_index in range(BingoCard.COL_COUNT):
-            total_marked = 0
-            for row_index in range(BingoCard.ROW_COUNT):
-                if self.board[row_index][col_index] is None:
-                    total_marked += 1
-            if total_marked == BingoCard.ROW_COUNT:
+        """Determines whether the board has won or not (i.e., one row or one column has all numbers
+        marked)"""
+        for mask in BingoCard.WINNING_MASKS:
+            if self.marked & mask == mask:
                 return True
 
         # Didn't win (yet) :(
@@ -63,8 +64,12 @@ class BingoCard:
     def __str__(self):
         # Print out the board.
         board_str = ""
-        for row in self.board: # type: typing.List
-            board_str += " ".join(["{0:02d}".format(col) if col is not None else "--" for col in row]) + "\n"
+        for row_index in range(BingoCard.ROW_COUNT):
+            row = []
+            for col_index in range(BingoCard.COL_COUNT):
+                index = row_index * BingoCard.COL_COUNT + col_index
+                row.append("{0:02d}".format(self.numbers[index]) if not self.marked & (1 << index) else "--")
+            board_str += " ".join(row) + "\n"
         return board_str.strip()
 
 def run_part1(file: typing.TextIO) -> int:
@@ -127,14 +132,85 @@ def run_part2(file: typing.TextIO) -> int:
 
     return last_winning_card.sum() * last_winning_number
 
+@variant(1, "indexed")
+def run_part1_indexed(file: typing.TextIO) -> int:
+    return __play_indexed(file, last=False)
+
+@variant(2, "indexed")
+def run_part2_indexed(file: typing.TextIO) -> int:
+    return __play_indexed(file, last=True)
+
+@variant(1, "numpy", available=np is not None)
+def run_part1_numpy(file: typing.TextIO) -> int:
+    return __play_numpy(file, last=False)
+
+@variant(2, "numpy", available=np is not None)
+def run_part2_numpy(file: typing.TextIO) -> int:
+    return __play_numpy(file, last=True)
+
+def __play_indexed(file: typing.TextIO, last: bool) -> int:
+    # Rather than playing the game out, figure out when each card wins up front. Number the calls
+    # in the order they're made (their "turn"); a row (or column) is complete on the turn of the last
+    # of its numbers to be called, and a card wins on the turn its first row (or column) is complete.
+    # Numbers that are never called (and cards that never win) get a turn past the end of the game.
+    bingo_numbers = __parse_bingo_numbers(file)
+    never = len(bingo_numbers)
+    turns = {}
+    for (turn, number) in enumerate(bingo_numbers):
+        turns.setdefault(number, turn)
+
+    # Now find the card that wins first (or last). Just like playing it out, if several cards win on
+    # the same turn, the one furthest down the list takes it.
+    cells = read_ints(file)
+    (winning_card, winning_turns, winning_turn) = (None, None, None)
+    for start in range(0, len(cells), BingoCard.ROW_COUNT * BingoCard.COL_COUNT):
+        card = cells[start:start + BingoCard.ROW_COUNT * BingoCard.COL_COUNT]
+        card_turns = [turns.get(number, never) for number in card]
+        rows = (card_turns[row * BingoCard.COL_COUNT:(row + 1) * BingoCard.COL_COUNT] for row in range(BingoCard.ROW_COUNT))
+        cols = (card_turns[col::BingoCard.COL_COUNT] for col in range(BingoCard.COL_COUNT))
+        win_turn = min(max(line) for line in itertools.chain(rows, cols))
+        if win_turn == never:
+            continue
+
+        if winning_turn is None or (win_turn >= winning_turn if last else win_turn <= winning_turn):
+            (winning_card, winning_turns, winning_turn) = (card, card_turns, win_turn)
+
+    # The score is the sum of the numbers that weren't called by the time the card won, multiplied
+    # by the number that made it win.
+    unmarked_sum = sum(number for (number, turn) in zip(winning_card, winning_turns) if turn > winning_turn)
+    return unmarked_sum * bingo_numbers[winning_turn]
+
+def __play_numpy(file: typing.TextIO, last: bool) -> int:
+    # Same idea as above, except for all the cards (as a cards × 5 × 5 array) at once.
+    bingo_numbers = np.array(__parse_bingo_numbers(file), dtype=np.int64)
+    cards = np.frombuffer(read_ints(file), dtype=np.int64).reshape(-1, BingoCard.ROW_COUNT, BingoCard.COL_COUNT)
+
+    # Build a lookup table of number -> the turn it was (first) called on. NOTE: When a number is
+    # assigned more than once, the last assignment sticks, so go backwards to end on the first call.
+    never = len(bingo_numbers)
+    turns = np.full(max(int(cards.max(initial=0)), int(bingo_numbers.max(initial=0))) + 1, never, dtype=np.int64)
+    turns[bingo_numbers[::-1]] = np.arange(never - 1, -1, -1)
+    card_turns = turns[cards]
+
+    # A card wins on the turn its first row (the max over axis 2) or column (the max over axis 1) is
+    # complete.
+    win_turns = np.minimum(card_turns.max(axis=2).min(axis=1), card_turns.max(axis=1).min(axis=1))
+    candidates = np.flatnonzero(win_turns < never)
+    winning_turn = win_turns[candidates].max() if last else win_turns[candidates].min()
+
+    # If several cards win on the same turn, the one furthest down the list takes it.
+    winner = candidates[win_turns[candidates] == winning_turn][-1]
+    unmarked_sum = int(cards[winner][card_turns[winner] > winning_turn].sum())
+    return unmarked_sum * int(bingo_numbers[winning_turn])
+
 def __parse_bingo_numbers(file: typing.TextIO) -> typing.List[int]:
     return [int(x) for x in file.readline().strip().split(",")]
 
 def __parse_bingo_cards(file: typing.TextIO) -> typing.List[BingoCard]:
     bingo_cards = []
     current_board = []
-    for line in file:
-        if line.strip() == "":
+    for row in read_int_rows(file):
+        if len(row) == 0:
             # This is an empty line...But is the current board valid, i.e., has five rows?
             if len(current_board) == 5:
                 # That means this is the start of a bingo card and we can
@@ -144,7 +220,7 @@ def __parse_bingo_cards(file: typing.TextIO) -> typing.List[BingoCard]:
                 current_board = []
         else:
             # The line isn't empty, so it must contain numbers. Add it to the current board.
-            current_board.append([int(num) for num in line.strip().split(" ") if num != ""])
+            current_board.append(list(row))
 
     # Don't forget to append the last board!
     bingo_cards.append(BingoCard(current_board))
@@ -1,10 +1,26 @@
+import bisect
 from dataclasses import dataclass
-import re
+import itertools
 import sys
+import types
 import typing
-from advent2021.core import run
+from advent2021.core import memo, np, read_int_rows, read_ints, run, track_memory, variant
 
-@dataclass
+# The (infinite) lines that a Line can lie on, by orientation. For each: the key of the line a point
+# (x, y) is on, how far along that line the point is, and the point at a key and distance.
+ORIENTATIONS = types.MappingProxyType({
+    "horizontal": (lambda x, y: y, lambda x, y: x, lambda key, t: (t, key)),
+    "vertical": (lambda x, y: x, lambda x, y: y, lambda key, t: (key, t)),
+    "backslash": (lambda x, y: x - y, lambda x, y: x, lambda key, t: (t, t - key)),
+    "slash": (lambda x, y: x + y, lambda x, y: x, lambda key, t: (t, key - t)),
+})
+
+# How many points of the diagonal lines we draw onto the raster at a time (so that we don't have to
+# hold the points of every diagonal line in memory at once).
+RASTER_BATCH_SIZE = 1 << 22
+
+@track_memory
+@dataclass(slots=True)
 class Line:
     x1: int
     y1: int
@@ -17,8 +33,6 @@ class Line:
         x_diff = self.x2 - self.x1
         y_diff = self.y2 - self.y1
 
-        print(x_diff, y_diff, self.is_horizontal, self.is_vertical, self.is_diagonal)
-
         # The switcheroo will be dependent on what kind of line we're working with.
         if self.is_horizontal:
             # If the x value is negative, flip it!
@@ -114,18 +128,292 @@ def run_part2(file: typing.TextIO) -> int:
     criteria = [point for (point, count) in points.items() if count > 1]
     return len(criteria)
 
+@variant(1, "incremental")
+def run_part1_incremental(file: typing.TextIO) -> int:
+    (_, overlap_count) = __axis_aligned_coverage(__axis_aligned_segments(__parse_lines(file)))
+    return overlap_count
+
+@variant(2, "incremental")
+def run_part2_incremental(file: typing.TextIO) -> int:
+    # Part 2 is Part 1 plus the diagonal lines, so start off with the points covered by the
+    # horizontal and vertical lines (which we've already figured out if Part 1 ran against the same
+    # lines) and only go through the points of the diagonal lines.
+    lines = __parse_lines(file)
+    (coverage, overlap_count) = __axis_aligned_coverage(__axis_aligned_segments(lines))
+
+    # NOTE: The coverage is cached, so count the diagonal points separately rather than adding them
+    #       to it.
+    diagonal_coverage = {}
+    for line in lines:
+        if not (line.is_horizontal or line.is_vertical):
+            for point in line.points():
+                diagonal_coverage[point] = diagonal_coverage.get(point, 0) + 1
+
+    # A point covered by the diagonals is a new overlap if it wasn't one already.
+    for (point, count) in diagonal_coverage.items():
+        axis_aligned_count = coverage.get(point, 0)
+        if axis_aligned_count <= 1 and axis_aligned_count + count > 1:
+            overlap_count += 1
+    return overlap_count
+
+def __axis_aligned_segments(lines: typing.List[Line]) -> typing.Tuple[typing.Tuple[int, int, int, int], ...]:
+    return tuple((line.x1, line.y1, line.x2, line.y2) for line in lines if line.is_horizontal or line.is_vertical)
+
+@memo(maxsize=4)
+def __axis_aligned_coverage(segments: typing.Tuple[typing.Tuple[int, int, int, int], ...]):
+    # How many times each point is covered by the horizontal and vertical lines (and how many of
+    # those points are covered more than once), cached so both parts can use it.
+    coverage = {}
+    for segment in segments:
+        for point in Line(*segment).points():
+            coverage[point] = coverage.get(point, 0) + 1
+    return (coverage, sum(1 for count in coverage.values() if count > 1))
+
+@variant(1, "raster", available=np is not None)
+def run_part1_raster(file: typing.TextIO) -> int:
+    segments = __parse_segments(file)
+    canvas = __rasterize(segments[(segments[:, 0] == segments[:, 2]) | (segments[:, 1] == segments[:, 3])])
+    return int(np.count_nonzero(canvas > 1))
+
+@variant(2, "raster", available=np is not None)
+def run_part2_raster(file: typing.TextIO) -> int:
+    canvas = __rasterize(__parse_segments(file))
+    return int(np.count_nonzero(canvas > 1))
+
+@variant(1, "sweep")
+def run_part1_sweep(file: typing.TextIO) -> int:
+    return __count_overlaps_sweep([line for line in __parse_lines(file) if line.is_horizontal or line.is_vertical])
+
+@variant(2, "sweep")
+def run_part2_sweep(file: typing.TextIO) -> int:
+    return __count_overlaps_sweep(__parse_lines(file))
+
+def __count_overlaps_sweep(lines: typing.List[Line]) -> int:
+    # Rather than visiting every point of every line (which doesn't work when the coordinates get
+    # huge), work with the lines as intervals. Lines with the same orientation lie on the same
+    # (infinite) line if they share a key (e.g., horizontal lines with the same y), in which case
+    # they're intervals of the same axis (e.g., x) and can overlap.
+    intervals = {orientation: {} for orientation in ORIENTATIONS}
+    for line in lines:
+        orientation = __orientation(line)
+        (key, along, _) = ORIENTATIONS[orientation]
+        (start, end) = sorted((along(line.x1, line.y1), along(line.x2, line.y2)))
+        intervals[orientation].setdefault(key(line.x1, line.y1), []).append((start, end))
+
+    # First, sweep through the intervals on each (infinite) line, keeping track of the stretches
+    # covered by at least one interval (the "covered" stretches) and at least two (the "overlapping"
+    # stretches). The points in the overlapping stretches count towards our answer.
+    covered = {orientation: {} for orientation in ORIENTATIONS}
+    overlapping = {orientation: {} for orientation in ORIENTATIONS}
+    overlap_count = 0
+    for orientation in ORIENTATIONS:
+        for (key, key_intervals) in intervals[orientation].items():
+            (covered[orientation][key], overlapping[orientation][key]) = __sweep(key_intervals)
+            overlap_count += sum(end - start + 1 for (start, end) in overlapping[orientation][key])
+
+    # Next, find the points where lines of different orientations cross (see `__crossings()`).
+    crossings = set()
+    for (orientation_a, orientation_b) in itertools.combinations(ORIENTATIONS, 2):
+        crossings.update(__crossings(orientation_a, covered[orientation_a], orientation_b, covered[orientation_b]))
+
+    # Finally, the crossings count too--but each of them only once. A crossing may already be part of
+    # the overlapping stretches we counted (possibly of more than one orientation, e.g., where an
+    # overlapping horizontal stretch meets an overlapping vertical stretch), so take those back out.
+    # NOTE: Any point that's part of the overlapping stretches of two orientations is a crossing, so
+    #       this catches every point we've counted more than once.
+    for point in crossings:
+        times_counted = 0
+        for (orientation, (key, along, _)) in ORIENTATIONS.items():
+            stretches = overlapping[orientation].get(key(*point))
+            if stretches and __is_within(stretches, along(*point)):
+                times_counted += 1
+        overlap_count += 1 - times_counted
+
+    return overlap_count
+
+def __crossings(orientation_a: str, covered_a, orientation_b: str, covered_b):
+    # Sweep through the covered stretches of orientation A in order of their keys. Walking along a
+    # stretch of orientation B, A's key goes up (or down) a step at a time, so each stretch of B is
+    # "active" from the first A key it reaches to the last. The active stretches of B are kept in
+    # order of their own keys (see `__ActiveKeys`), and B's key goes up (or down) steadily along a
+    # stretch of A too, so a stretch of A crosses exactly the active stretches whose keys are within
+    # the range it passes through--which we can go straight to, without looking at any others.
+    (key_a, _, point_a) = ORIENTATIONS[orientation_a]
+    (key_b, _, point_b) = ORIENTATIONS[orientation_b]
+
+    # How much does B's key change with each step along a line of A? It's the same for every line
+    # of A. (Diagonals of different directions only cross at a grid point if their keys have the same
+    # parity, which is why B's keys are split up by what's left over when dividing by this.)
+    slope = key_b(*point_a(0, 1)) - key_b(*point_a(0, 0))
+    step = abs(slope)
+
+    # Each stretch of B is switched on before the stretches of A with the same key are checked, and
+    # switched off after them. (The covered stretches on a line of B never touch, so only one of them
+    # is ever on at a time.)
+    (SWITCH_ON, CHECK, SWITCH_OFF) = (0, 1, 2)
+    events = []
+    for (key, stretches) in covered_b.items():
+        for (start, end) in stretches:
+            (first, last) = sorted((key_a(*point_b(key, start)), key_a(*point_b(key, end))))
+            events.append((first, SWITCH_ON, key))
+            events.append((last, SWITCH_OFF, key))
+    for (key, stretches) in covered_a.items():
+        events.extend((key, CHECK, start, end) for (start, end) in stretches)
+    events.sort()
+
+    active = [__ActiveKeys(sorted({key for key in covered_b if key % step == remainder})) for remainder in range(step)]
+    for event in events:
+        if event[1] == SWITCH_ON:
+            active[event[2] % step].add(event[2], 1)
+        elif event[1] == SWITCH_OFF:
+            active[event[2] % step].add(event[2], -1)
+        else:
+            (key, _, start, end) = event
+            first_key = key_b(*point_a(key, start))
+            last_key = first_key + slope * (end - start)
+            for crossed_key in active[first_key % step].between(min(first_key, last_key), max(first_key, last_key)):
+                yield point_a(key, start + (crossed_key - first_key) // slope)
+
+class __ActiveKeys:
+    # Which of a (sorted) list of keys are switched on, kept as a Fenwick tree (a.k.a. a binary
+    # indexed tree) so that switching a key on or off, and finding the next one that's on, takes
+    # O(log n) time.
+    def __init__(self, keys: typing.List[int]):
+        self.keys = keys
+        self.counts = [0] * (len(keys) + 1)
+
+    def add(self, key: int, change: int):
+        index = bisect.bisect_left(self.keys, key) + 1
+        while index < len(self.counts):
+            self.counts[index] += change
+            index += index & -index
+
+    def between(self, low: int, high: int) -> typing.Iterator[int]:
+        # The keys that are on from `low` to `high` (inclusive) are the (n + 1)th, (n + 2)th, ...
+        # keys that are on, where n is how many are on below `low`.
+        on_below = self.__count(bisect.bisect_left(self.keys, low))
+        on_through = self.__count(bisect.bisect_right(self.keys, high))
+        for rank in range(on_below + 1, on_through + 1):
+            yield self.keys[self.__find(rank)]
+
+    def __count(self, index: int) -> int:
+        # How many of the first `index` keys are on?
+        count = 0
+        while index > 0:
+            count += self.counts[index]
+            index -= index & -index
+        return count
+
+    def __find(self, rank: int) -> int:
+        # Where is the `rank`th key that's on? (Walk down the tree, skipping every subtree that
+        # doesn't have enough keys that are on.)
+        index = 0
+        bit = 1 << (len(self.counts) - 1).bit_length()
+        while bit > 0:
+            if index + bit < len(self.counts) and self.counts[index + bit] < rank:
+                index += bit
+                rank -= self.counts[index]
+            bit >>= 1
+        return index
+
+def __orientation(line: Line) -> str:
+    if line.is_horizontal:
+        return "horizontal"
+    if line.is_vertical:
+        return "vertical"
+
+    # Lines are normalized to go left to right, so if y goes up along with x, it's a "\" diagonal.
+    return "backslash" if line.y2 > line.y1 else "slash"
+
+def __sweep(intervals: typing.List[typing.Tuple[int, int]]):
+    # Each interval [start, end] starts covering at `start` and stops right after `end`.
+    events = sorted(itertools.chain(((start, 1) for (start, _) in intervals), ((end + 1, -1) for (_, end) in intervals)))
+    (covered, overlapping) = ([], [])
+    depth = 0
+    for (position, change) in events:
+        previous_depth = depth
+        depth += change
+        if previous_depth == 0 and depth > 0:
+            covered.append([position, None])
+        elif previous_depth > 0 and depth == 0:
+            covered[-1][1] = position - 1
+        if previous_depth < 2 and depth >= 2:
+            overlapping.append([position, None])
+        elif previous_depth >= 2 and depth < 2:
+            overlapping[-1][1] = position - 1
+    return (covered, overlapping)
+
+def __is_within(stretches, position: int) -> bool:
+    # The stretches are sorted and don't overlap, so find the last one starting at (or before) the
+    # position.
+    index = bisect.bisect_right(stretches, [position, float("inf")]) - 1
+    return index >= 0 and stretches[index][0] <= position <= stretches[index][1]
+
+def __parse_segments(file: typing.TextIO):
+    # Read the lines as a (lines × 4) array, where each row is [x1, y1, x2, y2].
+    return np.frombuffer(read_ints(file), dtype=np.int64).reshape(-1, 4)
+
+def __rasterize(segments):
+    # Rather than counting the points in a dictionary, draw the lines onto a canvas (a dense 2D
+    # array, just big enough to fit all the lines) where each cell counts how many lines cover it.
+    if len(segments) == 0:
+        return np.zeros((0, 0), dtype=np.int16)
+
+    # The canvas starts at the top-left-most point of the lines (not at (0, 0)), so lines that are
+    # far away from the origin don't need a huge canvas.
+    (x1, y1, x2, y2) = segments.T
+    (min_x, min_y) = (int(min(x1.min(), x2.min())), int(min(y1.min(), y2.min())))
+    (x1, y1, x2, y2) = (x1 - min_x, y1 - min_y, x2 - min_x, y2 - min_y)
+    width = int(max(x1.max(), x2.max())) + 1
+    height = int(max(y1.max(), y2.max())) + 1
+
+    # No cell can be covered by more lines than we have, so use the smallest type that fits.
+    dtype = np.int16 if len(segments) < np.iinfo(np.int16).max else np.int32 if len(segments) < np.iinfo(np.int32).max else np.int64
+
+    # Horizontal (and vertical) lines are drawn without visiting every point: mark +1 where the line
+    # starts and -1 just past where it ends, then a running sum along the row (or column) fills in
+    # the points in between.
+    horizontal = y1 == y2
+    vertical = (x1 == x2) & ~horizontal
+    row_marks = np.zeros((height, width + 1), dtype=dtype)
+    np.add.at(row_marks, (y1[horizontal], np.minimum(x1, x2)[horizontal]), 1)
+    np.add.at(row_marks, (y1[horizontal], np.maximum(x1, x2)[horizontal] + 1), -1)
+    canvas = np.cumsum(row_marks, axis=1, dtype=dtype)[:, :width]
+    del row_marks
+
+    col_marks = np.zeros((height + 1, width), dtype=dtype)
+    np.add.at(col_marks, (np.minimum(y1, y2)[vertical], x1[vertical]), 1)
+    np.add.at(col_marks, (np.maximum(y1, y2)[vertical] + 1, x1[vertical]), -1)
+    canvas += np.cumsum(col_marks, axis=0, dtype=dtype)[:height, :]
+    del col_marks
+
+    # Diagonal lines are drawn point by point, generating the points of a batch of lines at a time.
+    diagonal = ~horizontal & ~vertical
+    __rasterize_diagonals(canvas, x1[diagonal], y1[diagonal], x2[diagonal], y2[diagonal])
+    return canvas
+
+def __rasterize_diagonals(canvas, x1, y1, x2, y2):
+    lengths = np.abs(x2 - x1) + 1
+    (step_x, step_y) = (np.sign(x2 - x1), np.sign(y2 - y1))
+    start = 0
+    while start < len(lengths):
+        # Take as many lines as we can without going (too far) past the batch size.
+        end = start + max(1, int(np.searchsorted(np.cumsum(lengths[start:]), RASTER_BATCH_SIZE)))
+        batch_lengths = lengths[start:end]
+
+        # The i-th point of a line is (x1 + i * step_x, y1 + i * step_y).
+        offsets = np.arange(batch_lengths.sum()) - np.repeat(np.cumsum(batch_lengths) - batch_lengths, batch_lengths)
+        xs = np.repeat(x1[start:end], batch_lengths) + np.repeat(step_x[start:end], batch_lengths) * offsets
+        ys = np.repeat(y1[start:end], batch_lengths) + np.repeat(step_y[start:end], batch_lengths) * offsets
+        np.add.at(canvas, (ys, xs), 1)
+        start = end
+
 def __parse_lines(file: typing.TextIO) -> typing.List[Line]:
     lines = []
-    for line in file:
+    for (x1, y1, x2, y2) in read_int_rows(file):
         # Parse each line (in the file) as an actual Line object. Format is as follow:
         # x1,y1 -> x2,y2
-        match = re.match(r"(?P<x1>\d+),(?P<y1>\d+) -> (?P<x2>\d+),(?P<y2>\d+)", line) # type: re.Match
-        lines.append(Line(
-            x1=int(match.group("x1")),
-            y1=int(match.group("y1")),
-            x2=int(match.group("x2")),
-            y2=int(match.group("y2"))
-        ))
+        lines.append(Line(x1=x1, y1=y1, x2=x2, y2=y2))
     return lines
 
 run(__package__, run_part1, run_part2)
@@ -1,38 +1,37 @@
 from dataclasses import dataclass
 import typing
-from advent2021.core import run
+from advent2021.core import Option, non_negative_int, np, positive_int, read_int_rows, read_ints, run, variant
 
-def run_part1(file: typing.TextIO) -> int:
-    MAX_DAYS = 18
+PART1_DAYS = 18
+PART2_DAYS = 256
 
-    # The input is composed of a single line--the "timer" of a lanternfish before it gives birth. :)
-    ages = [int(age) for age in file.readline().strip().split(",")]
-
-    # Go through each ages (we're making a copy of the ages in case we're modifying it to add a new
-    # lanternfish into the school) until we've reached day 80
-    for day in range(MAX_DAYS):
-        for (index, age) in enumerate(list(ages)):
-            if age == 0:
-                # Time to spawn a new lanternfish with an age of 8!
-                ages.append(8)
+# How the number of lanternfish of each age (0 through 8) changes from one day to the next:
+# TRANSITION[i][j] is how many fishes of age i (tomorrow) each fish of age j (today) turns into.
+TRANSITION = tuple(
+    tuple(1 if (j == i + 1) or (j == 0 and i in (6, 8)) else 0 for j in range(9))
+    for i in range(9)
+)
 
-                # Reset the age back to 6.
-                ages[index] = 6
-            else:
-                # Decrement.
-                ages[index] -= 1
-
-    print(ages)
+def run_part1(file: typing.TextIO, days: typing.Optional[int] = None, modulo: typing.Optional[int] = None) -> int:
+    # The input is composed of a single line--the "timer" of a lanternfish before it gives birth. :)
+    ages = read_ints(file)
 
-    # How many fishes did we ended up with?
-    return len(ages)
+    # We used to simulate every single lanternfish here, but the school grows *exponentially*, so
+    # project it with the transition matrix instead (see Part 2's buckets and `__project()`).
+    return __project(ages, days if days is not None else PART1_DAYS, modulo)
 
-def run_part2(file: typing.TextIO) -> int:
+def run_part2(file: typing.TextIO, days: typing.Optional[int] = None, modulo: typing.Optional[int] = None) -> int:
     # Same as before, but now up to 256!
-    MAX_DAYS = 256
+    initial_ages = read_ints(file)
+    return __project(initial_ages, days if days is not None else PART2_DAYS, modulo)
+
+@variant(2, "buckets")
+def run_part2_buckets(file: typing.TextIO, days: typing.Optional[int] = None, modulo: typing.Optional[int] = None) -> int:
+    # Walk the age buckets one day at a time (which is what `__project()` does in O(log n) steps).
+    MAX_DAYS = days if days is not None else PART2_DAYS
 
     # The input is composed of a single line--the "timer" of a lanternfish before it gives birth. :)
-    initial_ages = [int(age) for age in file.readline().strip().split(",")]
+    initial_ages = read_ints(file)
 
     # We can't (well, we can, but we shouldn't) use Part 1's attempt where we brute-force it because
     # that would require a lot of RAM just to store the numbers as the lanternfish *expotentially*
@@ -73,6 +72,138 @@ def run_part2(file: typing.TextIO) -> int:
                 age_buckets[6] += age_buckets_copy[0]
                 age_buckets[8] += age_buckets_copy[0]
 
-    return sum(age_buckets)
+    return sum(age_buckets) % modulo if modulo is not None else sum(age_buckets)
+
+@variant(1, "numpy", available=np is not None)
+def run_part1_numpy(file: typing.TextIO, days: typing.Optional[int] = None, modulo: typing.Optional[int] = None,
+                    horizons: typing.Optional[typing.Tuple[int, ...]] = None) -> int:
+    return __run_batch(file, days if days is not None else PART1_DAYS, modulo, horizons)
+
+@variant(2, "numpy", available=np is not None)
+def run_part2_numpy(file: typing.TextIO, days: typing.Optional[int] = None, modulo: typing.Optional[int] = None,
+                    horizons: typing.Optional[typing.Tuple[int, ...]] = None) -> int:
+    return __run_batch(file, days if days is not None else PART2_DAYS, modulo, horizons)
+
+def simulate_schools(schools: typing.Sequence[typing.Sequence[int]],
+                     horizons: typing.Iterable[int],
+                     modulo: typing.Optional[int] = None) -> typing.Dict[int, "np.ndarray"]:
+    """Simulates many independent schools of lanternfish at once, returning how many fishes each
+    school has (an array with one count per school) after each of the requested number of days.
+
+    All of the schools are advanced together (one day at a time) as the rows of a single
+    (schools × 9) matrix of age buckets, so every horizon is answered in one sweep."""
+    horizons = sorted(set(horizons))
+    if np is None:
+        raise RuntimeError("simulate_schools() needs NumPy")
+
+    # Each row is a school, and each column is the number of fishes of that age (just like the age
+    # buckets in `run_part2_buckets()`). A modulo that's too big for an int64 means we need Python's
+    # ints (object dtype) from the start.
+    too_big = modulo is not None and modulo > np.iinfo(np.int64).max // 18
+    buckets = np.zeros((len(schools), 9), dtype=object if too_big else np.int64)
+    school_of_fish = np.repeat(np.arange(len(schools)), [len(school) for school in schools])
+    ages = np.concatenate([np.asarray(school, dtype=np.int64) for school in schools] or [np.zeros(0, dtype=np.int64)])
+    np.add.at(buckets, (school_of_fish, ages), 1)
+
+    counts = {}
+    day = 0
+    for horizon in horizons:
+        while day < horizon:
+            # A bucket can (at most) double from one day to the next (bucket 6 takes on both buckets 7
+            # and 0), and a school's total is the sum of its 9 buckets, so once a bucket is past
+            # 1/18th of what an int64 can hold, switch over to Python's ints (object dtype) before the
+            # next day's buckets (or their total) overflow it.
+            if buckets.dtype != object and buckets.max(initial=0) > np.iinfo(np.int64).max // 18:
+                buckets = buckets.astype(object)
+
+            # Rolling the buckets to the left ages every fish by a day *and* moves the fishes whose
+            # timers were at 0 over to bucket 8 (as their newborns). The parents themselves go to 6.
+            buckets = np.roll(buckets, -1, axis=1)
+            buckets[:, 6] += buckets[:, 8]
+            if modulo is not None:
+                buckets %= modulo
+            day += 1
+
+        # (The check above also covers the schools we haven't advanced yet, e.g., on day 0.)
+        if buckets.dtype != object and buckets.max(initial=0) > np.iinfo(np.int64).max // 9:
+            buckets = buckets.astype(object)
+        totals = buckets.sum(axis=1)
+        counts[horizon] = totals % modulo if modulo is not None else totals
+
+    return counts
+
+def __run_batch(file: typing.TextIO, days: int, modulo: typing.Optional[int],
+                horizons: typing.Optional[typing.Tuple[int, ...]]) -> int:
+    # Each (non-blank) line of the input is its own school. When there's only one, this is just the
+    # puzzle; when there's more, the answer is the number of fishes across *all* schools (which is
+    # what the other variants get when they read every line as one big school).
+    schools = [row for row in read_int_rows(file) if len(row) > 0]
+    counts = simulate_schools(schools, (days, *(horizons or ())), modulo)
+
+    if horizons or len(schools) > 1:
+        requested = sorted(set(horizons or (days,)))
+        print("School\t" + "\t".join("Day {}".format(horizon) for horizon in requested))
+        for school in range(len(schools)):
+            print("{}\t".format(school + 1) + "\t".join(str(counts[horizon][school]) for horizon in requested))
+
+    # Add the schools up as Python ints, since the total across all of them can easily be past
+    # what an int64 can hold even when every school on its own isn't.
+    total = sum(int(count) for count in counts[days])
+    return total % modulo if modulo is not None else total
+
+def __project(ages: typing.Iterable[int], days: int, modulo: typing.Optional[int]) -> int:
+    # Each day, the age buckets (see `run_part2_buckets()`) change in the exact same way: each bucket
+    # takes on the fishes of the bucket above it, and the fishes in bucket 0 go to both buckets 6 and
+    # 8. That's a linear transformation, i.e., a 9 × 9 matrix that we multiply the buckets by:
+    #
+    #   buckets_after_one_day = TRANSITION × buckets
+    #   buckets_after_n_days  = TRANSITION^n × buckets
+    #
+    # ... and TRANSITION^n can be computed in O(log n) matrix multiplications by repeated squaring.
+    # We're using Python's ints, so the answer is exact no matter how big it gets (although, since
+    # the school grows exponentially, so does the number of digits--for really far-off days, pass a
+    # `modulo` to keep the numbers small).
+    age_buckets = [0 for i in range(9)]
+    for age in ages:
+        age_buckets[age] += 1
+
+    projection = __matrix_power(TRANSITION, days, modulo)
+    total = sum(projection[row][col] * age_buckets[col] for row in range(9) for col in range(9))
+    return total % modulo if modulo is not None else total
+
+def __matrix_power(matrix, exponent: int, modulo: typing.Optional[int]):
+    result = [[1 if row == col else 0 for col in range(len(matrix))] for row in range(len(matrix))]
+    while exponent > 0:
+        if exponent & 1:
+            result = __matrix_multiply(result, matrix, modulo)
+        matrix = __matrix_multiply(matrix, matrix, modulo)
+        exponent >>= 1
+    return result
+
+def __matrix_multiply(a, b, modulo: typing.Optional[int]):
+    columns = list(zip(*b))
+    product = [[sum(x * y for (x, y) in zip(row, column)) for column in columns] for row in a]
+    if modulo is not None:
+        product = [[value % modulo for value in row] for row in product]
+    return product
+
+def day_counts(value: str) -> typing.Tuple[int, ...]:
+    """An `Option` type for a comma-separated list of numbers of days."""
+    return tuple(non_negative_int(count) for count in value.split(","))
 
-run(__package__, run_part1, run_part2)
+run(__package__, run_part1, run_part2, options=[
+    Option("--days",
+           type=non_negative_int,
+           default=None,
+           help="How many days to simulate (by default, {} for Part 1 and {} for Part 2).".format(PART1_DAYS, PART2_DAYS)),
+    Option("--modulo",
+           type=positive_int,
+           default=None,
+           help="Only report the number of lanternfish modulo this number (for days so far off that the exact "
+                "number has billions of digits)."),
+    Option("--horizons",
+           type=day_counts,
+           default=None,
+           help="Also report how many lanternfish each school (i.e., each line of the input) has after each "
+                "of these (comma-separated) numbers of days, e.g., '18,80,256' (numpy variants only)."),
+])
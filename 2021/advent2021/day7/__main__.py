@@ -1,13 +1,38 @@
 from dataclasses import dataclass
+import argparse
+from itertools import accumulate
 import math
+import random
+import types
 import typing
-from advent2021.core import run
+from advent2021.core import Option, read_ints, run, variant
+
+# How much fuel a crab burns to move a distance of d: one per step in Part 1, and one more than the
+# previous step in Part 2 (1 + 2 + ... + d). Any other (convex) model added here can be picked with
+# `--fuel` for the ternary variants.
+FUEL_MODELS: typing.Mapping[str, typing.Callable[[int], int]] = types.MappingProxyType({
+    "linear": lambda d: d,
+    "triangular": lambda d: d * (d + 1) // 2,
+    "squared": lambda d: d * d,
+})
 
 def run_part1(file: typing.TextIO) -> int:
+    positions = read_ints(file)
+
+    # The total distance to a target, i.e., sum(|target - position|), goes down as we move the target
+    # towards whichever side has more crabs on it, so it's lowest right where both sides have the
+    # same number of crabs: the median. We don't need to sort the positions to find it, either--
+    # selecting it is O(n) (see `__select()`).
+    target = __select(list(positions), (len(positions) - 1) // 2)
+    print("Aligning the crabs to position {}".format(target))
+    return sum(abs(target - position) for position in positions)
+
+@variant(1, "scan")
+def run_part1_scan(file: typing.TextIO) -> int:
     # Read all the positions and figure out which position we should align
     # the crabs to. :)
     best_pos = None
-    positions = [int(pos) for pos in file.readline().strip().split(",")]
+    positions = read_ints(file)
 
     # Go through each position
     for current_position in positions:
@@ -23,10 +48,39 @@ def run_part1(file: typing.TextIO) -> int:
     return best_pos
 
 def run_part2(file: typing.TextIO) -> int:
+    positions = read_ints(file)
+
+    # As the original solution (`run_part2_mean()`) figured out, the best target is around the mean.
+    # To be exact, the fuel cost is 1/2 × sum((target - position)^2 + |target - position|), so the
+    # target that minimizes it is within 1/2 of the mean. Rather than trusting floor(mean) and
+    # ceil(mean) (which, with floats, can be off for huge inputs), check every integer near the mean
+    # using integer arithmetic only...
+    costs = {}
+    def cost_of(target: int) -> int:
+        if target not in costs:
+            costs[target] = __triangular_cost(positions, target)
+        return costs[target]
+
+    mean_floor = sum(positions) // len(positions)
+    target = min(range(mean_floor - 1, mean_floor + 3), key=cost_of)
+
+    # ... and make sure that it really is the lowest. The cost only goes up the further we get from
+    # the best target, so if neither of its neighbors is cheaper, nothing else is, either. (This
+    # should never have to move, but if it does, keep walking downhill.)
+    for step in (-1, 1):
+        while cost_of(target + step) < cost_of(target):
+            target += step
+    cost = cost_of(target)
+
+    print("Aligning the crabs to position {}".format(target))
+    return cost
+
+@variant(2, "mean")
+def run_part2_mean(file: typing.TextIO) -> int:
     # Read all the positions and figure out which position we should align
     # the crabs to. :)
     best_pos = None
-    positions = [int(pos) for pos in file.readline().strip().split(",")]
+    positions = read_ints(file)
 
     # Since we want to meet in the "middle" of the position (where their "fuel cost" is based off
     # 1 + 2 + ... n (where n is the number of steps taken)), the best choice for the crabs
@@ -49,4 +103,151 @@ def run_part2(file: typing.TextIO) -> int:
 
     return min(fuel_cost_floor, fuel_cost_ceil)
 
-run(__package__, run_part1, run_part2)
+@variant(1, "histogram")
+def run_part1_histogram(file: typing.TextIO, curve: typing.Optional[typing.TextIO] = None) -> int:
+    return __run_histogram(file, "linear", curve)
+
+@variant(2, "histogram")
+def run_part2_histogram(file: typing.TextIO, curve: typing.Optional[typing.TextIO] = None) -> int:
+    return __run_histogram(file, "triangular", curve)
+
+@variant(1, "ternary")
+def run_part1_ternary(file: typing.TextIO, fuel: typing.Optional[str] = None) -> int:
+    return __run_ternary(file, fuel or "linear")
+
+@variant(2, "ternary")
+def run_part2_ternary(file: typing.TextIO, fuel: typing.Optional[str] = None) -> int:
+    return __run_ternary(file, fuel or "triangular")
+
+def cost_curve(positions: typing.Sequence[int], model: str) -> typing.List[int]:
+    """Returns how much fuel the crabs need to align to each position, from the left-most crab to
+    the right-most one (i.e., `cost_curve(...)[i]` is the cost of aligning to `min(positions) + i`).
+
+    Only the "linear" and "triangular" fuel models are supported (since they can be worked out for
+    every position at once in O(range + n) time); use `minimize_cost()` for the others."""
+    if model not in ("linear", "triangular"):
+        raise ValueError("Can't compute the cost curve of the '{}' fuel model".format(model))
+
+    # Count how many crabs are at each position...
+    lowest = min(positions)
+    counts = [0] * (max(positions) - lowest + 1)
+    for position in positions:
+        counts[position - lowest] += 1
+
+    # ... so that the number (and the sum) of the positions of the crabs at or to the left of each
+    # position is just a running total away.
+    crabs_left = list(accumulate(counts))
+    positions_left = list(accumulate(count * (lowest + offset) for (offset, count) in enumerate(counts)))
+    total_crabs = crabs_left[-1]
+    total_positions = positions_left[-1]
+    total_squares = sum(position * position for position in positions)
+
+    curve = []
+    for offset in range(len(counts)):
+        target = lowest + offset
+
+        # The crabs on the left move target - position each, and the ones on the right move
+        # position - target each.
+        crabs_right = total_crabs - crabs_left[offset]
+        positions_right = total_positions - positions_left[offset]
+        distance = (target * crabs_left[offset] - positions_left[offset]) + (positions_right - target * crabs_right)
+        if model == "linear":
+            curve.append(distance)
+            continue
+
+        # 1 + 2 + ... + d = (d^2 + d) / 2, and the sum of (target - position)^2 over all crabs expands
+        # to n × target^2 - 2 × target × sum(positions) + sum(positions^2).
+        squared_distance = total_crabs * target * target - 2 * target * total_positions + total_squares
+        curve.append((squared_distance + distance) // 2)
+
+    return curve
+
+def minimize_cost(positions: typing.Sequence[int], fuel: typing.Callable[[int], int]) -> typing.Tuple[int, int]:
+    """Finds a position that costs the crabs the least fuel to align to, returning that
+    position and its cost. `fuel` is how much fuel a crab needs to move a given distance, which must
+    be convex (e.g., any of the `FUEL_MODELS`) so the total cost only goes down and then up.
+
+    This uses a ternary search, so it only needs to work out the total cost of O(log range)
+    positions (each of which takes O(number of distinct positions))."""
+    counts: typing.Dict[int, int] = {}
+    for position in positions:
+        counts[position] = counts.get(position, 0) + 1
+
+    def cost_of(target: int) -> int:
+        return sum(count * fuel(abs(target - position)) for (position, count) in counts.items())
+
+    (low, high) = (min(counts), max(counts))
+    while high - low > 2:
+        third = (high - low) // 3
+        (left, right) = (low + third, high - third)
+        (left_cost, right_cost) = (cost_of(left), cost_of(right))
+
+        # The cheapest position can't be on the more expensive side (otherwise the cost would have
+        # to go up, down, and then up again). If they cost the same, it's in between.
+        if left_cost < right_cost:
+            high = right - 1
+        elif left_cost > right_cost:
+            low = left + 1
+        else:
+            (low, high) = (left, right)
+
+    target = min(range(low, high + 1), key=cost_of)
+    return (target, cost_of(target))
+
+def __run_ternary(file: typing.TextIO, model: str) -> int:
+    (target, cost) = minimize_cost(read_ints(file), FUEL_MODELS[model])
+    print("Aligning the crabs to position {}".format(target))
+    return cost
+
+def __run_histogram(file: typing.TextIO, model: str, curve_file: typing.Optional[typing.TextIO]) -> int:
+    positions = read_ints(file)
+    curve = cost_curve(positions, model)
+
+    if curve_file is not None:
+        lowest = min(positions)
+        curve_file.write("position,cost\n")
+        for (offset, cost) in enumerate(curve):
+            curve_file.write("{},{}\n".format(lowest + offset, cost))
+        curve_file.flush()
+
+    return min(curve)
+
+def __triangular_cost(positions: typing.Sequence[int], target: int) -> int:
+    # Moving n steps costs 1 + 2 + ... + n fuel.
+    return sum(abs(target - position) * (abs(target - position) + 1) for position in positions) // 2
+
+def __select(values: typing.List[int], k: int) -> int:
+    # Finds the k-th smallest (starting from 0) of the values in O(n) time (on average) with
+    # quickselect: split the values into those less than, equal to, and greater than a random pivot,
+    # then only keep looking in the part that the k-th smallest value falls in.
+    while True:
+        pivot = random.choice(values)
+        lower = [value for value in values if value < pivot]
+        if k < len(lower):
+            values = lower
+            continue
+
+        same = sum(1 for value in values if value == pivot)
+        if k < len(lower) + same:
+            return pivot
+
+        k -= len(lower) + same
+        values = [value for value in values if value > pivot]
+
+def fuel_model(value: str) -> str:
+    """An `Option` type for the name of one of the `FUEL_MODELS`."""
+    if value not in FUEL_MODELS:
+        raise argparse.ArgumentTypeError("'{}' isn't a fuel model (choose from {})".format(value, ", ".join(FUEL_MODELS)))
+    return value
+
+run(__package__, run_part1, run_part2, options=[
+    Option("--curve",
+           type=argparse.FileType("w"),
+           default=None,
+           help="Write the fuel cost of aligning to every position to this file (as a CSV; histogram variants only)."),
+    Option("--fuel",
+           type=fuel_model,
+           default=None,
+           help="How much fuel a crab burns to move (one of {}; by default, linear for Part 1 and triangular "
+                "for Part 2; ternary variants only).".format(", ".join(FUEL_MODELS))),
+])
@@ -1,7 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 import math
+import mmap
+import os
 import typing
-from advent2021.core import run
+from advent2021.core import Option, positive_int, run, variant
+from advent2021.day8.decode import decode_chunk, decode_displays, decode_part
+
+# Roughly how many bytes of the input each worker process decodes at a time.
+PARALLEL_CHUNK_SIZE = 1 << 24
 
 def run_part1(file: typing.TextIO) -> int:
     count = 0
@@ -162,10 +169,63 @@ def run_part2(file: typing.TextIO) -> int:
 
     return running_sum
 
+@variant(2, "bitmask")
+def run_part2_bitmask(file: typing.TextIO) -> int:
+    return decode_displays(file)
+
+@variant(1, "parallel")
+def run_part1_parallel(file: typing.TextIO, workers: int = os.cpu_count() or 1) -> int:
+    return __run_parallel(file, 1, workers)
+
+@variant(2, "parallel")
+def run_part2_parallel(file: typing.TextIO, workers: int = os.cpu_count() or 1) -> int:
+    return __run_parallel(file, 2, workers)
+
+def __run_parallel(file: typing.TextIO, part: int, workers: int) -> int:
+    # Every line of the input is its own display, so split the input up into chunks (that end at the
+    # end of a line) and let each worker process decode a chunk at a time. The workers read their
+    # chunk straight from the file themselves, so all we send them is where the chunk is.
+    path = getattr(file, "name", None)
+    if not isinstance(path, str) or not os.path.isfile(path) or workers == 1:
+        # We don't have a file to split up (e.g., the input is coming in through stdin), or there's
+        # no one to split it up with.
+        return decode_part(part, file)
+
+    chunks = __split_lines(path, workers)
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks) or 1)) as executor:
+        partial_results = executor.map(decode_chunk, [path] * len(chunks), [part] * len(chunks), chunks)
+        return sum(partial_results)
+
+def __split_lines(path: str, workers: int) -> typing.List[typing.Tuple[int, int]]:
+    # Cut the file into (at least) one chunk per worker, nudging every cut forward to just after the
+    # next newline so no line gets split between two chunks.
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    chunk_count = max(workers, -(-size // PARALLEL_CHUNK_SIZE))
+    chunks = []
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        for chunk in range(1, chunk_count + 1):
+            end = size if chunk == chunk_count else data.find(b"\n", max(start, size * chunk // chunk_count))
+            end = size if end == -1 else end + 1
+            if end > start:
+                chunks.append((start, end))
+                start = end
+            if start == size:
+                break
+    return chunks
+
 def __first_or_default(list: typing.List[str], criteria: typing.Callable[[str], bool]):
     try:
         return next(filter(criteria, list))
     except StopIteration:
         return None
 
-run(__package__, run_part1, run_part2)
+run(__package__, run_part1, run_part2, options=[
+    Option("--workers",
+           type=positive_int,
+           default=os.cpu_count() or 1,
+           help="How many processes the parallel variants split the input between."),
+])
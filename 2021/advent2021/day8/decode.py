@@ -0,0 +1,78 @@
+from itertools import permutations
+import mmap
+import typing
+from advent2021.core import memo
+
+# These live outside of `__main__` so the parallel variants' worker processes can import them. When a
+# worker process is spawned (rather than forked), it starts with a fresh interpreter that has to look
+# up what it's been asked to run by module and name, and it can't find it in the parent's `__main__`.
+
+# Which segments each digit lights up when the display is wired correctly.
+DIGIT_SEGMENTS = ("abcefg", "cf", "acdeg", "acdfg", "bcdf", "abdfg", "abdefg", "acf", "abcdefg", "abcdfg")
+
+def decode_chunk(path: str, part: int, chunk: typing.Tuple[int, int]) -> int:
+    """Solves `part` for the lines between the `(start, end)` byte offsets of `chunk` in the file at
+    `path`. (This runs in a worker process.)"""
+    (start, end) = chunk
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        lines = data[start:end].decode("ascii").splitlines()
+    return decode_part(part, lines)
+
+def decode_part(part: int, lines: typing.Iterable[str]) -> int:
+    """Solves `part` for `lines`."""
+    if part == 1:
+        return count_easy_digits(lines)
+    return decode_displays(lines)
+
+def count_easy_digits(lines: typing.Iterable[str]) -> int:
+    """Counts how many times 1, 4, 7, or 8 show up in the outputs of `lines`."""
+    # Same as `run_part1()`: 1, 4, 7, and 8 are the only digits with 2, 4, 3, and 7 segments.
+    count = 0
+    for line in lines:
+        (_, output) = line.split("|")
+        count += sum(1 for value in output.split() if len(value) in (2, 3, 4, 7))
+    return count
+
+def decode_displays(lines: typing.Iterable[str]) -> int:
+    """Decodes the output of every display in `lines`, and adds them all up."""
+    # Rather than deducing the wiring one segment at a time, look it up: turn each pattern into a
+    # 7-bit mask (bit 0 is "a", bit 1 is "b", and so on). No matter what order the ten patterns of a
+    # line are in, they make the same set of masks, and every possible wiring gives a different set,
+    # so that set tells us exactly which digit each mask is (see `wiring_table()`).
+    table = wiring_table()
+
+    # The same patterns (in the same order of letters) show up again and again, so only work out the
+    # mask of each one once.
+    masks = PatternMasks()
+    mask_of = masks.__getitem__
+
+    running_sum = 0
+    for line in lines:
+        # Every line has ten patterns, the pipe, and then the four digits of the output.
+        words = line.split()
+        digit_of = table[frozenset(map(mask_of, words[:10]))]
+        (thousands, hundreds, tens, ones) = [digit_of[mask_of(output)] for output in words[11:]]
+        running_sum += thousands * 1000 + hundreds * 100 + tens * 10 + ones
+
+    return running_sum
+
+class PatternMasks(dict):
+    """The 7-bit mask of each pattern (bit 0 is "a", bit 1 is "b", and so on), worked out the first
+    time the pattern is looked up."""
+    def __missing__(self, pattern: str) -> int:
+        mask = self[pattern] = sum(1 << (ord(segment) - ord("a")) for segment in pattern)
+        return mask
+
+@memo
+def wiring_table() -> typing.Dict[typing.FrozenSet[int], typing.Tuple[typing.Optional[int], ...]]:
+    """Maps the set of masks the ten patterns make under every possible wiring to which digit (if
+    any) each of the 128 masks is under that wiring."""
+    # There are only 7! = 5040 ways to mix up the wires to the segments, so work out what the ten
+    # patterns look like for every single one of them (once).
+    table = {}
+    for wiring in permutations(range(7)):
+        digit_of: typing.List[typing.Optional[int]] = [None] * 128
+        for (digit, segments) in enumerate(DIGIT_SEGMENTS):
+            digit_of[sum(1 << wiring[ord(segment) - ord("a")] for segment in segments)] = digit
+        table[frozenset(mask for mask in range(128) if digit_of[mask] is not None)] = tuple(digit_of)
+    return table
@@ -1,6 +1,16 @@
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import math
+import os
 import sys
 import typing
-from advent2021.core import run
+from advent2021.core import Option, np, positive_int, run, variant
+from advent2021.day9.basins import (BASIN_RUN, Run, find, label_tile, label_tile_from_file, merge_runs, row_risk_level,
+                                    union)
+
+# How many tiles (bands of rows) each worker process gets to label, so a worker that finishes early
+# can pick up another tile rather than sit around.
+TILES_PER_WORKER = 4
 
 def run_part1(file: typing.TextIO) -> int:
     # NOTE: The heights are being represented as a list of list of int, with the inner list
@@ -114,6 +124,214 @@ def run_part2(file: typing.TextIO) -> int:
     basins.sort(reverse=True)
     return basins[0] * basins[1] * basins[2]
 
+@variant(1, "streaming")
+def run_part1_streaming(file: typing.TextIO) -> int:
+    (risk_level, _) = __scan_streaming(file)
+    return risk_level
+
+@variant(2, "streaming")
+def run_part2_streaming(file: typing.TextIO) -> int:
+    (_, largest_basins) = __scan_streaming(file)
+    return math.prod(largest_basins)
+
+def __scan_streaming(file: typing.TextIO) -> typing.Tuple[int, typing.List[int]]:
+    # Works out both the risk level (Part 1) and the sizes of the three largest basins (Part 2) while
+    # reading the heightmap a row at a time, without ever holding more than three rows of it.
+    risk_level = 0
+    largest_basins: typing.List[int] = []
+
+    # For Part 1, a height in a row can only be judged once we've seen the rows above and below it,
+    # so we're always a row behind: (above, current) are the last two rows we've read.
+    (above, current) = (None, None)
+
+    # For Part 2, think of each row as stretches ("runs") of basin heights split up by 9s. A run is
+    # part of the same basin as every run in the row above that it touches, so we keep the runs of
+    # the last row (start, end, basin) and how big each basin that's still "open" is so far.
+    previous_runs: typing.List[Run] = []
+    basin_sizes: typing.Dict[int, int] = {}
+    next_basin = 0
+
+    for line in file:
+        row = line.strip()
+        if not row:
+            continue
+
+        if current is not None:
+            risk_level += row_risk_level(above, current, row)
+        (above, current) = (current, row)
+
+        # Every run starts out as its own basin...
+        runs = []
+        parents: typing.Dict[int, int] = {}
+        for match in BASIN_RUN.finditer(row):
+            runs.append((match.start(), match.end(), next_basin))
+            basin_sizes[next_basin] = match.end() - match.start()
+            parents[next_basin] = next_basin
+            next_basin += 1
+        for (_, _, basin) in previous_runs:
+            parents[basin] = basin
+
+        # ... until we find out that it touches a run in the row above (which has to be part of the
+        # same basin).
+        merge_runs(previous_runs, runs, parents, basin_sizes)
+
+        # Any basin that was in the last row but didn't make it to this one is done.
+        runs = [(start, end, find(parents, basin)) for (start, end, basin) in runs]
+        open_basins = {basin for (_, _, basin) in runs}
+        for (_, _, basin) in previous_runs:
+            basin = find(parents, basin)
+            if basin not in open_basins and basin in basin_sizes:
+                __keep_largest(largest_basins, basin_sizes.pop(basin))
+        previous_runs = runs
+
+    # Don't forget the last row (which doesn't have anything below it), and the basins that reach it.
+    if current is not None:
+        risk_level += row_risk_level(above, current, None)
+    for size in basin_sizes.values():
+        __keep_largest(largest_basins, size)
+
+    return (risk_level, sorted(largest_basins, reverse=True))
+
+@variant(1, "numpy", available=np is not None)
+def run_part1_numpy(file: typing.TextIO) -> int:
+    heights = __read_heights_numpy(file)
+
+    # Surround the heightmap with a border that's higher than any height (so the heights along the
+    # edges never have to worry about the neighbors they don't have), and then compare every height
+    # against the heights up, down, left, and right of it all at once.
+    padded = np.full((heights.shape[0] + 2, heights.shape[1] + 2), np.iinfo(np.uint8).max, dtype=np.uint8)
+    padded[1:-1, 1:-1] = heights
+    is_low_point = ((heights < padded[:-2, 1:-1]) & (heights < padded[2:, 1:-1]) &
+                    (heights < padded[1:-1, :-2]) & (heights < padded[1:-1, 2:]))
+    return int(heights[is_low_point].sum(dtype=np.int64)) + int(is_low_point.sum())
+
+@variant(2, "numpy", available=np is not None)
+def run_part2_numpy(file: typing.TextIO) -> int:
+    heights = __read_heights_numpy(file)
+    in_basin = heights != 9
+
+    # Label every height in a basin with the position (in the flattened heightmap) of where its
+    # stretch of the row starts, and the 9s with a label that's past the end of it (so they're always
+    # the highest label). Then merge the labels of neighboring heights (like a union-find, just for
+    # every height at once) until every height is labeled with the lowest position in its basin.
+    outside = heights.size
+    label_type = np.int32 if outside < np.iinfo(np.int32).max else np.int64
+    starts_run = in_basin.copy()
+    starts_run[:, 1:] &= ~in_basin[:, :-1]
+    positions = np.arange(heights.size, dtype=label_type).reshape(heights.shape)
+    run_starts = np.maximum.accumulate(np.where(starts_run, positions, 0), axis=1)
+    labels = np.append(np.where(in_basin, run_starts, outside).reshape(-1), label_type(outside))
+    while True:
+        grid = labels[:-1].reshape(heights.shape)
+        lowest = grid.copy()
+        np.minimum(lowest[1:, :], grid[:-1, :], out=lowest[1:, :])
+        np.minimum(lowest[:-1, :], grid[1:, :], out=lowest[:-1, :])
+        np.minimum(lowest[:, 1:], grid[:, :-1], out=lowest[:, 1:])
+        np.minimum(lowest[:, :-1], grid[:, 1:], out=lowest[:, :-1])
+        lowering = in_basin & (lowest < grid)
+        if not lowering.any():
+            break
+
+        # Every label is the position of the height at the "root" of its (partial) basin, so rather
+        # than relabeling a single height, relabel the *root*, which takes every height that points
+        # at it along...
+        relabeled = np.zeros(labels.size, dtype=bool)
+        relabeled[grid[lowering]] = True
+        roots = np.flatnonzero(relabeled)
+        np.minimum.at(labels, grid[lowering], lowest[lowering])
+
+        # ... and then have every height point straight at its root again ("pointer jumping"). Only
+        # the roots we just relabeled can be pointing at something other than a root, so get them
+        # sorted out first, and then every height is only a single jump away.
+        while True:
+            pointing_at = labels[roots]
+            jumped = labels[pointing_at]
+            if np.array_equal(jumped, pointing_at):
+                break
+            labels[roots] = jumped
+        labels = labels[labels]
+
+    basin_sizes = np.bincount(labels[:-1][in_basin.reshape(-1)], minlength=1)
+    largest_basins = np.sort(basin_sizes)[::-1][:3]
+    return int(np.prod(largest_basins[largest_basins > 0], dtype=object))
+
+def __read_heights_numpy(file: typing.TextIO) -> "np.ndarray":
+    # Every row has the same number of heights, so the raw bytes of the heightmap (newlines and all)
+    # can be viewed as a (rows × (width + 1)) grid of digits, with the newlines as the last column.
+    raw = file.read()
+    if isinstance(raw, str):
+        raw = raw.encode("ascii")
+    raw = raw.replace(b"\r", b"").strip(b"\n") + b"\n"
+
+    width = raw.index(b"\n")
+    digits = np.frombuffer(raw, dtype=np.uint8).reshape(-1, width + 1)[:, :width]
+    return digits - ord("0")
+
+@variant(1, "parallel")
+def run_part1_parallel(file: typing.TextIO, workers: int = os.cpu_count() or 1) -> int:
+    (risk_level, _) = __scan_tiled(file, workers)
+    return risk_level
+
+@variant(2, "parallel")
+def run_part2_parallel(file: typing.TextIO, workers: int = os.cpu_count() or 1) -> int:
+    (_, largest_basins) = __scan_tiled(file, workers)
+    return math.prod(largest_basins)
+
+def __scan_tiled(file: typing.TextIO, workers: int) -> typing.Tuple[int, typing.List[int]]:
+    # Cut the heightmap into bands of rows ("tiles") and have a pool of worker processes find the low
+    # points and label the basins of each tile on its own. The workers read their tile straight from
+    # the file themselves (every row is the same length, so we know exactly where each one starts),
+    # so all we send them is which rows to look at.
+    path = getattr(file, "name", None)
+    if not isinstance(path, str) or not os.path.isfile(path) or workers == 1:
+        # We don't have a file to split up (e.g., the input is coming in through stdin), or there's
+        # no one to split it up with, so the whole heightmap is one big tile.
+        rows = [row for row in (line.strip() for line in file) if row]
+        tiles = [label_tile(rows, None, None)] if rows else []
+    else:
+        # Every row takes up the same number of bytes as the first one, including its line ending
+        # (which might be "\r\n" rather than just "\n").
+        with open(path, "rb") as heightmap:
+            stride = len(heightmap.readline())
+        row_count = -(-os.path.getsize(path) // stride) if stride > 0 else 0
+        tile_count = min(row_count, workers * TILES_PER_WORKER)
+        bands = [(row_count * tile // tile_count, row_count * (tile + 1) // tile_count) for tile in range(tile_count)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tiles = list(executor.map(label_tile_from_file, [path] * len(bands), [stride] * len(bands), bands))
+
+    # Now for the merge: a basin can spill over the border between two tiles, in which case the
+    # basins on either side of it (that touch) are the same basin. Give every (tile, local basin) its
+    # own place in a union-find to figure out which ones are actually the same.
+    parents: typing.Dict[int, int] = {}
+    basin_sizes: typing.Dict[int, int] = {}
+    first_basins = []
+    next_basin = 0
+    for tile in tiles:
+        first_basins.append(next_basin)
+        for (basin, size) in tile.basin_sizes.items():
+            parents[next_basin + basin] = next_basin + basin
+            basin_sizes[next_basin + basin] = size
+        next_basin += max(tile.basin_sizes, default=-1) + 1
+
+    for index in range(1, len(tiles)):
+        above = tiles[index - 1].last_row_basins
+        below = tiles[index].first_row_basins
+        for (basin_above, basin_below) in zip(above, below):
+            if basin_above is not None and basin_below is not None:
+                union(parents, basin_sizes, first_basins[index - 1] + basin_above, first_basins[index] + basin_below)
+
+    largest_basins: typing.List[int] = []
+    for size in basin_sizes.values():
+        __keep_largest(largest_basins, size)
+    return (sum(tile.risk_level for tile in tiles), sorted(largest_basins, reverse=True))
+
+def __keep_largest(largest_basins: typing.List[int], size: int):
+    # `largest_basins` is a min-heap of (at most) the three largest basins we've seen.
+    if len(largest_basins) < 3:
+        heapq.heappush(largest_basins, size)
+    elif size > largest_basins[0]:
+        heapq.heapreplace(largest_basins, size)
+
 def __is_coords_valid(heights, row, col):
     # Ensure that the height and column doesn't exceed the dimensions of the board
     if row < 0 or row >= len(heights):
@@ -130,4 +348,9 @@ def __is_coords_valid(heights, row, col):
     else:
         return False
 
-run(__package__, run_part1, run_part2)
+run(__package__, run_part1, run_part2, options=[
+    Option("--workers",
+           type=positive_int,
+           default=os.cpu_count() or 1,
+           help="How many processes the parallel variants split the heightmap between."),
+])
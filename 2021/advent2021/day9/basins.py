@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+import mmap
+import re
+import typing
+
+# These live outside of `__main__` so the parallel variants' worker processes can import them. When a
+# worker process is spawned (rather than forked), it starts with a fresh interpreter that has to look
+# up what it's been asked to run by module and name, and it can't find it in the parent's `__main__`.
+
+# A stretch of heights (in a row) that are part of a basin, i.e., anything but a 9.
+BASIN_RUN = re.compile(r"[0-8]+")
+
+# A run of basin heights in a row: where it starts, where it ends (exclusive), and its basin.
+Run = typing.Tuple[int, int, int]
+
+@dataclass
+class Tile:
+    """What a worker process found out about its band of rows of the heightmap."""
+    risk_level: int
+    basin_sizes: typing.Dict[int, int]
+
+    # The (local) basin of each height in the first and last rows of the tile (or None for the 9s),
+    # which is how the basins get stitched together across tiles.
+    first_row_basins: typing.List[typing.Optional[int]]
+    last_row_basins: typing.List[typing.Optional[int]]
+
+def label_tile_from_file(path: str, stride: int, band: typing.Tuple[int, int]) -> Tile:
+    """Labels the `(first, end)` band of rows of the heightmap at `path`, whose rows are all `stride`
+    bytes long. (This runs in a worker process.)"""
+    # Read the rows of our band, plus the rows right above and below it (if there are any) so we can
+    # tell whether the heights along its edges are low points.
+    (first_row, end_row) = band
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = max(first_row - 1, 0) * stride
+        end = (end_row + 1) * stride
+        rows = [row for row in data[start:end].decode("ascii").splitlines() if row]
+
+    above = rows.pop(0) if first_row > 0 and rows else None
+    below = rows.pop() if len(rows) > end_row - first_row else None
+    return label_tile(rows, above, below)
+
+def label_tile(rows: typing.List[str], above: typing.Optional[str], below: typing.Optional[str]) -> Tile:
+    """Finds the low points and labels the basins of `rows`, given the rows right `above` and `below`
+    them (if there are any)."""
+    # Same idea as streaming through the heightmap, except that we hang on to every basin (since one
+    # that looks done might still continue in another tile), and remember which basins the first and
+    # last rows belong to.
+    risk_level = 0
+    parents: typing.Dict[int, int] = {}
+    basin_sizes: typing.Dict[int, int] = {}
+    previous_runs: typing.List[Run] = []
+    first_runs: typing.List[Run] = []
+
+    for (index, row) in enumerate(rows):
+        row_above = rows[index - 1] if index > 0 else above
+        row_below = rows[index + 1] if index + 1 < len(rows) else below
+        risk_level += row_risk_level(row_above, row, row_below)
+
+        runs = []
+        for match in BASIN_RUN.finditer(row):
+            basin = len(parents)
+            parents[basin] = basin
+            basin_sizes[basin] = match.end() - match.start()
+            runs.append((match.start(), match.end(), basin))
+        merge_runs(previous_runs, runs, parents, basin_sizes)
+
+        if index == 0:
+            first_runs = runs
+        previous_runs = runs
+
+    def row_basins(runs: typing.List[Run]) -> typing.List[typing.Optional[int]]:
+        basins: typing.List[typing.Optional[int]] = [None] * (len(rows[0]) if rows else 0)
+        for (start, end, basin) in runs:
+            basins[start:end] = [find(parents, basin)] * (end - start)
+        return basins
+
+    return Tile(risk_level, basin_sizes, row_basins(first_runs), row_basins(previous_runs))
+
+def row_risk_level(above: typing.Optional[str], row: str, below: typing.Optional[str]) -> int:
+    """Adds up the risk level of the low points in `row`, given the rows right `above` and `below` it
+    (if there are any)."""
+    # Same as Part 1: a low point is lower than the heights up, down, left, and right of it (when
+    # there's one there). Note that the digits compare the same way as strings as they do as ints.
+    risk_level = 0
+    last = len(row) - 1
+    for (col, height) in enumerate(row):
+        if col > 0 and height >= row[col - 1]:
+            continue
+        if col < last and height >= row[col + 1]:
+            continue
+        if above is not None and height >= above[col]:
+            continue
+        if below is not None and height >= below[col]:
+            continue
+        risk_level += int(height) + 1
+    return risk_level
+
+def merge_runs(previous_runs: typing.List[Run], runs: typing.List[Run], parents: typing.Dict[int, int],
+               basin_sizes: typing.Dict[int, int]):
+    """Merges the basin of every run in `runs` with the basins of the runs it touches in
+    `previous_runs` (the row above it)."""
+    # Both rows' runs are in order, so we can walk through them side by side.
+    above_index = 0
+    for (start, end, basin) in runs:
+        while above_index < len(previous_runs) and previous_runs[above_index][1] <= start:
+            above_index += 1
+        touching = above_index
+        while touching < len(previous_runs) and previous_runs[touching][0] < end:
+            union(parents, basin_sizes, basin, previous_runs[touching][2])
+            touching += 1
+
+def find(parents: typing.Dict[int, int], basin: int) -> int:
+    """Finds the basin that `basin` has been merged into."""
+    while parents[basin] != basin:
+        parents[basin] = parents[parents[basin]]
+        basin = parents[basin]
+    return basin
+
+def union(parents: typing.Dict[int, int], basin_sizes: typing.Dict[int, int], basin: int, other_basin: int):
+    """Merges `other_basin` into `basin` (adding up their sizes)."""
+    (basin, other_basin) = (find(parents, basin), find(parents, other_basin))
+    if basin != other_basin:
+        parents[other_basin] = basin
+        basin_sizes[basin] += basin_sizes.pop(other_basin)
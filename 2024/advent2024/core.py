@@ -1,7 +1,10 @@
 import argparse
+from array import array
 from dataclasses import dataclass
+import io
 import logging
 from logging import NullHandler, StreamHandler
+import re
 import sys
 import typing
 import time
@@ -9,6 +12,9 @@ import traceback
 import colorama
 from colorama import Fore, Style
 
+# How many bytes the integer tokenizer reads from the input at a time.
+TOKEN_CHUNK_SIZE = 1 << 16
+
 def run(
     module_name: str,
      part1_func: typing.Callable[[typing.TextIO], str],
@@ -85,3 +91,56 @@ def run(
 
         if args.expected is not None:
             print(Fore.LIGHTBLUE_EX + "[👀] Expected:\t" + Style.BRIGHT + str(args.expected), Style.RESET_ALL)
+
+def read_ints(file: typing.IO) -> array:
+    """Reads every integer in `file` (from wherever it's currently at until the end) into an
+    `array('q')`.
+
+    The integers can be separated by anything that isn't a digit, so this works for comma-separated
+    (`3,4,3,1,2`), whitespace-separated (`3   4`), and `a,b -> c,d` inputs alike. The input is
+    scanned as bytes, a chunk at a time, so a single (very long) line is never held in memory as
+    a `str`."""
+    numbers = array("q")
+    for chunk in _read_token_chunks(file):
+        numbers.extend(map(int, _INTEGER_TOKEN.findall(chunk)))
+    return numbers
+
+def read_int_rows(file: typing.IO) -> typing.List[array]:
+    """Reads the integers in `file` (from wherever it's currently at until the end) line by line,
+    returning an `array('q')` for each line. Blank lines are kept (as empty arrays) so inputs that
+    use them as separators can still tell where one group ends and the next begins."""
+    rows = []
+    carry = b""
+    for chunk in _read_byte_chunks(file):
+        lines = (carry + chunk).split(b"\n")
+        carry = lines.pop()
+        rows.extend(array("q", map(int, _INTEGER_TOKEN.findall(line))) for line in lines)
+
+    # Don't forget the last line (if the file doesn't end with a newline)!
+    if carry.strip():
+        rows.append(array("q", map(int, _INTEGER_TOKEN.findall(carry))))
+    return rows
+
+_INTEGER_TOKEN = re.compile(rb"-?\d+")
+
+def _read_byte_chunks(file: typing.IO) -> typing.Iterator[bytes]:
+    # Files opened in text mode (e.g., the `infile` argument) hand us back a `str`, so turn it back
+    # into bytes. Going through the text layer (rather than `file.buffer`) keeps us from skipping
+    # past whatever the text layer has already buffered (e.g., if the caller `readline()`'d a header).
+    text_mode = isinstance(file, io.TextIOBase)
+    while True:
+        chunk = file.read(TOKEN_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk.encode("ascii") if text_mode else chunk
+
+def _read_token_chunks(file: typing.IO) -> typing.Iterator[bytes]:
+    # A chunk can end in the middle of a number, so hold on to any trailing digits (and sign) and
+    # glue them onto the front of the next chunk.
+    carry = b""
+    for chunk in _read_byte_chunks(file):
+        chunk = carry + chunk
+        head = chunk.rstrip(b"-0123456789")
+        carry = chunk[len(head):]
+        yield head
+    yield carry
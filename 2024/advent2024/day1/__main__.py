@@ -1,6 +1,6 @@
 from collections import Counter
 import typing
-from advent2024.core import run
+from advent2024.core import read_ints, run
 
 def part1(lines):
     # Read in the two list from the provided input file.
@@ -45,14 +45,11 @@ def part2(lines):
 def _read_lists(lines: typing.TextIO) -> typing.Tuple[typing.List[int], typing.List[int]]:
     # Read in the two lists that we're expecting. The input file should contain two numbers 
     # separated by a space. The first number belongs to the first list and the second number belongs
-    # to the second list.
-    list_one = []
-    list_two = []
-    for line in lines:
-        (number_one, number_two) = line.split(maxsplit=2)
-        list_one.append(int(number_one))
-        list_two.append(int(number_two))
-    
+    # to the second list (i.e., the numbers alternate between the two lists).
+    numbers = read_ints(lines)
+    list_one = numbers[0::2].tolist()
+    list_two = numbers[1::2].tolist()
+
     return (list_one, list_two)
 
 run(__package__, part1, part2)
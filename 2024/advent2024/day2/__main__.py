@@ -1,12 +1,11 @@
 from itertools import pairwise
 import typing
-from advent2024.core import run
+from advent2024.core import read_int_rows, run
 
 def part1(lines: typing.TextIO):
     # Each line represents a report. Each report has a numerical level, separated by a space.
     safe_count = 0
-    for report in lines:
-        levels = [int(level) for level in report.split()]
+    for levels in read_int_rows(lines):
 
         # Determine if we're increasing or not by looking at the first two levels.
         is_increasing = is_level_change_increasing(levels[0], levels[1])